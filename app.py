@@ -1,27 +1,31 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-from flask_session import Session
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file, g
 import os
-import json
+import queue
+import atexit
 import threading
 import time
 import math
 from functools import wraps
-from openpyxl import load_workbook
+from operator import itemgetter
 from datetime import datetime, time as dt_time, timedelta
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 import secrets
 from financial_utils import (
-    get_gold_price, get_official_usd_rate, save_to_excel,
-    normalize_row_to_new_format, get_column_index,
+    fetch_all_rates, append_financial_rows,
+    build_column_map, get_column_index, get_header_index,
     round_numeric_value, NEW_FORMAT_HEADERS, COL_TIMESTAMP,
     COL_GOLD_24K_HOLDINGS, COL_GOLD_21K_HOLDINGS, COL_USD_BALANCE,
     COL_GOLD_24K_PRICE, COL_GOLD_21K_PRICE, COL_OFFICIAL_USD_RATE,
     COL_TOTAL_GOLD_VALUE, COL_TOTAL_USD_VALUE, COL_TOTAL_WEALTH,
-    get_last_holdings
+    last_holdings_from_rows, load_financial_rows, delete_financial_entry,
+    migrate_excel_to_csv, rebuild_excel_if_stale, warm_http_session,
+    FINANCIAL_SUMMARY_CSV, FINANCIAL_SUMMARY_FILE
 )
 from price_tracker import (
     check_all_prices,
+    load_price_history,
+    price_history_as_lists,
     next_daily_digest_utc,
     send_daily_digest_from_cache_if_due,
 )
@@ -56,12 +60,14 @@ def next_gold_price_check_utc(after_utc: datetime) -> datetime:
 load_dotenv()
 
 app = Flask(__name__)
-app.config["SESSION_TYPE"] = "filesystem"
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["SESSION_COOKIE_SECURE"] = True
-app.secret_key = os.getenv("SECRET_KEY", os.urandom(24).hex())
-Session(app)
+# Sessions are signed with this key, so it must be stable across restarts and shared by
+# every worker; a random per-process fallback would log users out on each restart
+app.secret_key = os.getenv("SECRET_KEY")
+if not app.secret_key:
+    raise RuntimeError("SECRET_KEY must be set in environment variables.")
 
 # Authentication credentials from environment variables
 APP_USERNAME = os.getenv("APP_USERNAME")
@@ -70,21 +76,37 @@ APP_PASSWORD = os.getenv("APP_PASSWORD")
 if not APP_USERNAME or not APP_PASSWORD:
     raise RuntimeError("APP_USERNAME and APP_PASSWORD must be set in environment variables.")
 
+# One-time migration of an existing financial_summary.xlsx into the CSV store
+try:
+    migrate_excel_to_csv()
+except Exception as e:
+    print(f"Error migrating Excel data to CSV: {e}")
+
+# Open the shared HTTPS pool now so the first form submission skips the TLS handshake
+warm_http_session()
+
+@app.before_request
+def load_csrf_token():
+    """Read the CSRF token from the session once per request"""
+    g.csrf_token = session.get('csrf_token')
+
 def generate_csrf_token():
     """Generate a new CSRF token and store it in session"""
     token = secrets.token_urlsafe(32)
     session['csrf_token'] = token
+    g.csrf_token = token
     return token
 
 def get_csrf_token():
     """Get existing CSRF token or generate a new one"""
-    if 'csrf_token' not in session:
+    token = g.get('csrf_token')
+    if not token:
         return generate_csrf_token()
-    return session['csrf_token']
+    return token
 
 def verify_csrf_token(token):
     """Verify CSRF token from form submission"""
-    session_token = session.get('csrf_token')
+    session_token = g.get('csrf_token')
     if not session_token or not token:
         return False
     # Use constant-time comparison to prevent timing attacks
@@ -129,6 +151,135 @@ def logout():
     session.clear()
     return redirect(url_for("login"))
 
+# Rows submitted from the form are saved by a single background writer so the POST
+# doesn't wait on disk I/O; whatever is pending is written as one batch and fsynced.
+# A batch that still fails after SAVE_ATTEMPTS is reported on the next page load.
+_write_q = queue.Queue()
+SAVE_ATTEMPTS = 3
+_save_errors = []
+_save_errors_lock = threading.Lock()
+
+def _writer_loop():
+    while True:
+        batch = [_write_q.get()]
+        while True:
+            try:
+                batch.append(_write_q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            for attempt in range(1, SAVE_ATTEMPTS + 1):
+                try:
+                    append_financial_rows(batch, fsync=True)
+                    break
+                except Exception as e:
+                    print(f"Error saving financial summary ({len(batch)} rows, attempt {attempt}): {e}")
+                    if attempt == SAVE_ATTEMPTS:
+                        with _save_errors_lock:
+                            _save_errors.append(
+                                f"Could not save the entry from {', '.join(row[0] for row in batch)}: {e}"
+                            )
+                    else:
+                        time.sleep(0.5 * attempt)
+        finally:
+            for _ in batch:
+                _write_q.task_done()
+
+def wait_for_pending_saves():
+    """Blocks until every queued row has been written to the CSV store (or given up on)."""
+    _write_q.join()
+
+def pop_save_errors():
+    """Messages for background saves that failed since the last call; clears them."""
+    with _save_errors_lock:
+        errors = list(_save_errors)
+        _save_errors.clear()
+    return errors
+
+threading.Thread(target=_writer_loop, daemon=True).start()
+atexit.register(wait_for_pending_saves)
+
+# Normalized history table for the index page, reused until the CSV store changes on disk.
+# Keyed by the identity of the parsed rows list: load_financial_rows() hands back the
+# same list until the file's mtime/size changes, so no extra stat call is needed here.
+_DATA_CACHE = {"source": None, "data": None, "headers": None, "timestamp_col_index": 0}
+_DATA_CACHE_LOCK = threading.Lock()
+
+def _invalidate_history_cache():
+    """Force the next index() GET to rebuild the history table."""
+    with _DATA_CACHE_LOCK:
+        _DATA_CACHE["source"] = None
+
+def _load_history_table(existing_headers, rows):
+    """
+    Returns (headers, table, timestamp_col_index) for the history table, where table
+    is a list of normalized row tuples, newest first.
+    Takes the rows already loaded by the caller so the store is only read once per request.
+    """
+    if not rows:
+        return NEW_FORMAT_HEADERS, [], 0
+
+    with _DATA_CACHE_LOCK:
+        if _DATA_CACHE["source"] is rows:
+            return _DATA_CACHE["headers"], _DATA_CACHE["data"], _DATA_CACHE["timestamp_col_index"]
+
+        # Use existing headers or default to NEW_FORMAT_HEADERS
+        headers = existing_headers if len(existing_headers) == 10 else NEW_FORMAT_HEADERS
+
+        # Get timestamp column index by name
+        timestamp_col_index = get_column_index(headers, COL_TIMESTAMP)
+        if timestamp_col_index is None:
+            timestamp_col_index = 0  # Fallback to first column
+
+        # Column permutation from the stored layout to `headers`, computed once per load;
+        # numeric values are rounded to 2 decimal places (except timestamp)
+        col_map = build_column_map(existing_headers, headers)
+        round_cols = [header != COL_TIMESTAMP for header in headers]
+
+        # Work column by column: transpose once, round each numeric column with a single
+        # map() pass, then transpose back, instead of dispatching per cell
+        width = max(len(existing_headers), max(len(row) for row in rows))
+        full_rows = [row if len(row) == width else row + (None,) * (width - len(row)) for row in rows]
+        columns = list(zip(*full_rows))
+        # Missing columns point at a trailing all-None column so the permutation is a
+        # single itemgetter call over the column list
+        columns.append((None,) * len(full_rows))
+        pick_columns = itemgetter(*[width if i is None else i for i in col_map])
+        table_columns = [
+            tuple(map(round_numeric_value, column)) if rounded else column
+            for column, rounded in zip(pick_columns(columns), round_cols)
+        ]
+
+        data = list(zip(*table_columns))
+        data.reverse()  # Reverse the order to show latest details on top
+
+        _DATA_CACHE["source"] = rows
+        _DATA_CACHE["headers"] = headers
+        _DATA_CACHE["data"] = data
+        _DATA_CACHE["timestamp_col_index"] = timestamp_col_index
+        return headers, data, timestamp_col_index
+
+def _current_holdings(existing_headers, rows):
+    """The last saved holdings and totals, keyed the way index.html reads them."""
+    last = last_holdings_from_rows(existing_headers, rows)
+    return {
+        "gold_holdings_24k": last.get("gold_24k"),
+        "gold_holdings_21k": last.get("gold_21k"),
+        "usd_balance": last.get("usd_balance"),
+        "gold_price_24k": last.get("gold_price_24k"),
+        "gold_price_21k": last.get("gold_price_21k"),
+        "official_usd_rate": last.get("official_usd_rate"),
+        "total_gold_value_egp": last.get("total_gold_value_egp"),
+        "total_usd_value_egp": last.get("total_usd_value_egp"),
+        "total_wealth_egp": last.get("total_wealth_egp"),
+    }
+
+def _render_index_error(error):
+    """Re-renders the dashboard with an error; the form and "Current Holdings" card keep the last saved values."""
+    wait_for_pending_saves()
+    holdings = _current_holdings(*load_financial_rows(FINANCIAL_SUMMARY_CSV))
+    return render_template("index.html", error=error, holdings=holdings, csrf_token=get_csrf_token())
+
 @app.route("/", methods=["GET", "POST"])
 @login_required
 def index():
@@ -136,7 +287,7 @@ def index():
         # Verify CSRF token
         csrf_token = request.form.get("csrf_token")
         if not verify_csrf_token(csrf_token):
-            return render_template("index.html", error="Invalid security token. Please try again.", csrf_token=get_csrf_token())
+            return _render_index_error("Invalid security token. Please try again.")
         
         try:
             # Get 24k gold holdings (optional)
@@ -145,10 +296,10 @@ def index():
                 try:
                     value = float(request.form["gold_holdings_24k"])
                     if value < 0:
-                        return render_template("index.html", error="Gold 24k holdings cannot be negative.", csrf_token=get_csrf_token())
+                        return _render_index_error("Gold 24k holdings cannot be negative.")
                     gold_holdings_24k = round(value, 2)
                 except ValueError:
-                    return render_template("index.html", error="Gold 24k holdings must be a valid number.", csrf_token=get_csrf_token())
+                    return _render_index_error("Gold 24k holdings must be a valid number.")
             
             # Get 21k gold holdings (optional)
             gold_holdings_21k = None
@@ -156,26 +307,28 @@ def index():
                 try:
                     value = float(request.form["gold_holdings_21k"])
                     if value < 0:
-                        return render_template("index.html", error="Gold 21k holdings cannot be negative.", csrf_token=get_csrf_token())
+                        return _render_index_error("Gold 21k holdings cannot be negative.")
                     gold_holdings_21k = round(value, 2)
                 except ValueError:
-                    return render_template("index.html", error="Gold 21k holdings must be a valid number.", csrf_token=get_csrf_token())
+                    return _render_index_error("Gold 21k holdings must be a valid number.")
             
             # USD balance is required
             if not request.form.get("usd_balance"):
-                return render_template("index.html", error="USD Balance is required.", csrf_token=get_csrf_token())
+                return _render_index_error("USD Balance is required.")
             
             try:
                 usd_value = float(request.form["usd_balance"])
                 if usd_value < 0:
-                    return render_template("index.html", error="USD Balance cannot be negative.", csrf_token=get_csrf_token())
+                    return _render_index_error("USD Balance cannot be negative.")
                 usd_balance = round(usd_value, 2)
             except ValueError:
-                return render_template("index.html", error="USD Balance must be a valid number.", csrf_token=get_csrf_token())
+                return _render_index_error("USD Balance must be a valid number.")
 
             # Fetch both 24k and 21k gold prices
-            gold_price_24k, gold_price_21k = get_gold_price()
-            official_usd_rate = get_official_usd_rate()
+            # Reuse prices fetched within the last few minutes (background checker or earlier POST)
+            rates = fetch_all_rates()
+            gold_price_24k, gold_price_21k = rates["gold_24k"], rates["gold_21k"]
+            official_usd_rate = rates["usd"]
 
             if (gold_price_24k or gold_price_21k) and official_usd_rate:
                 # Calculate total gold value by combining both 24k and 21k holdings
@@ -186,74 +339,30 @@ def index():
                     total_gold_value_egp += gold_holdings_21k * gold_price_21k
                 # Round the final total to avoid floating point precision issues
                 total_gold_value_egp = round(total_gold_value_egp, 2)
-                
+
                 total_usd_value_egp = round(usd_balance * official_usd_rate, 2)
                 total_wealth_egp = round(total_gold_value_egp + total_usd_value_egp, 2)
 
             current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            save_to_excel(
+            _write_q.put((
                 current_timestamp, gold_holdings_24k, gold_holdings_21k, usd_balance,
                 gold_price_24k, gold_price_21k, official_usd_rate,
                 total_gold_value_egp, total_usd_value_egp, total_wealth_egp
-            )
-
-            # Store in session
-            session["gold_holdings_24k"] = gold_holdings_24k
-            session["gold_holdings_21k"] = gold_holdings_21k
-            session["usd_balance"] = usd_balance
-            session["gold_price_24k"] = gold_price_24k
-            session["gold_price_21k"] = gold_price_21k
-            session["official_usd_rate"] = official_usd_rate
-            session["total_gold_value_egp"] = total_gold_value_egp
-            session["total_usd_value_egp"] = total_usd_value_egp
-            session["total_wealth_egp"] = total_wealth_egp
+            ))
 
             return redirect(url_for("index"))
         except Exception as e:
-            return render_template("index.html", error=f"An error occurred: {str(e)}", csrf_token=get_csrf_token())
+            return _render_index_error(f"An error occurred: {str(e)}")
 
-    # Load data from Excel with backward compatibility
-    file_path = "financial_summary.xlsx"
-    headers = NEW_FORMAT_HEADERS  # Default to new format headers
-    data = []
-    timestamp_col_index = 0  # Default index for timestamp column
-    
-    if os.path.exists(file_path):
-        workbook = load_workbook(file_path)
-        sheet = workbook.active
-        existing_headers = [cell.value for cell in sheet[1]]
-        
-        # Use existing headers or default to NEW_FORMAT_HEADERS
-        headers = existing_headers if len(existing_headers) == 10 else NEW_FORMAT_HEADERS
-        
-        # Get timestamp column index by name
-        timestamp_col_index = get_column_index(headers, COL_TIMESTAMP)
-        if timestamp_col_index is None:
-            timestamp_col_index = 0  # Fallback to first column
-        
-        # Read and normalize rows
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if row:  # Skip empty rows
-                normalized_row = normalize_row_to_new_format(row, existing_headers)
-                # Convert dictionary to list in header order and round numeric values
-                data_row = []
-                for header in headers:
-                    value = normalized_row.get(header, None)
-                    # Round numeric values to 2 decimal places (except timestamp)
-                    if header != COL_TIMESTAMP:
-                        value = round_numeric_value(value, 2)
-                    data_row.append(value)
-                # Extract timestamp for delete button (always at timestamp_col_index)
-                timestamp_value = data_row[timestamp_col_index] if timestamp_col_index < len(data_row) else None
-                data.append({
-                    'row': data_row,
-                    'timestamp': timestamp_value
-                })
-        
-        data.reverse()  # Reverse the order to show latest details on top
+    # Load data from the CSV store with backward compatibility
+    # Make sure rows submitted just before the redirect are on disk, and report any that failed
+    wait_for_pending_saves()
+    save_errors = pop_save_errors()
+    existing_headers, rows = load_financial_rows(FINANCIAL_SUMMARY_CSV)
+    headers, table, timestamp_col_index = _load_history_table(existing_headers, rows)
 
     # Pagination for history table
-    total_records = len(data)
+    total_records = len(table)
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
 
@@ -267,30 +376,31 @@ def index():
 
     start_idx = (page - 1) * per_page
     end_idx = start_idx + per_page
-    data = data[start_idx:end_idx]
+    # Only the visible page is turned into template rows
+    data = [
+        {
+            'row': list(data_row),
+            # Timestamp for delete button (always at timestamp_col_index)
+            'timestamp': data_row[timestamp_col_index] if timestamp_col_index < len(data_row) else None
+        }
+        for data_row in table[start_idx:end_idx]
+    ]
 
     # Always load the latest snapshot from history so the "Current Holdings" card
-    # doesn't rely on stale client-side cached values.
-    last = get_last_holdings(file_path)
-    session["gold_holdings_24k"] = last.get("gold_24k")
-    session["gold_holdings_21k"] = last.get("gold_21k")
-    session["usd_balance"] = last.get("usd_balance")
-    session["gold_price_24k"] = last.get("gold_price_24k")
-    session["gold_price_21k"] = last.get("gold_price_21k")
-    session["official_usd_rate"] = last.get("official_usd_rate")
-    session["total_gold_value_egp"] = last.get("total_gold_value_egp")
-    session["total_usd_value_egp"] = last.get("total_usd_value_egp")
-    session["total_wealth_egp"] = last.get("total_wealth_egp")
+    # doesn't rely on stale client-side cached values. Reuses the rows loaded above.
+    holdings = _current_holdings(existing_headers, rows)
 
     return render_template(
         "index.html",
         headers=headers,
         data=data,
+        holdings=holdings,
         csrf_token=get_csrf_token(),
         page=page,
         per_page=per_page,
         total_pages=total_pages,
         total_records=total_records,
+        error=" ".join(save_errors) or None,
     )
 
 @app.route("/telegram-webhook", methods=["POST"])
@@ -309,54 +419,52 @@ def analytics():
 @login_required
 def api_analytics():
     """API endpoint to get analytics data"""
-    file_path = "financial_summary.xlsx"
-    price_history_path = "price_history.json"
+    file_path = FINANCIAL_SUMMARY_CSV
     data = []
-    price_history = {}
     
-    # Load price history for trend charts (more frequent data)
-    if os.path.exists(price_history_path):
-        try:
-            with open(price_history_path, 'r') as f:
-                price_history = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            price_history = {}
+    # Load price history for trend charts (more frequent data): snapshot + append log
+    price_history = price_history_as_lists(load_price_history())
     
-    if os.path.exists(file_path):
-        try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
-            headers = [cell.value for cell in sheet[1]]
-            
-            # Get column indices
-            timestamp_idx = get_column_index(headers, COL_TIMESTAMP)
-            gold_24k_holdings_idx = get_column_index(headers, COL_GOLD_24K_HOLDINGS)
-            gold_21k_holdings_idx = get_column_index(headers, COL_GOLD_21K_HOLDINGS)
-            usd_balance_idx = get_column_index(headers, COL_USD_BALANCE)
-            gold_24k_price_idx = get_column_index(headers, COL_GOLD_24K_PRICE)
-            gold_21k_price_idx = get_column_index(headers, COL_GOLD_21K_PRICE)
-            usd_rate_idx = get_column_index(headers, COL_OFFICIAL_USD_RATE)
-            gold_value_idx = get_column_index(headers, COL_TOTAL_GOLD_VALUE)
-            usd_value_idx = get_column_index(headers, COL_TOTAL_USD_VALUE)
-            total_wealth_idx = get_column_index(headers, COL_TOTAL_WEALTH)
-            
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if row and any(cell is not None for cell in row):
-                    entry = {
-                        'timestamp': row[timestamp_idx] if timestamp_idx is not None else None,
-                        'gold_holdings_24k': row[gold_24k_holdings_idx] if gold_24k_holdings_idx is not None else None,
-                        'gold_holdings_21k': row[gold_21k_holdings_idx] if gold_21k_holdings_idx is not None else None,
-                        'usd_balance': row[usd_balance_idx] if usd_balance_idx is not None else None,
-                        'gold_price_24k': row[gold_24k_price_idx] if gold_24k_price_idx is not None else None,
-                        'gold_price_21k': row[gold_21k_price_idx] if gold_21k_price_idx is not None else None,
-                        'usd_rate': row[usd_rate_idx] if usd_rate_idx is not None else None,
-                        'gold_value': row[gold_value_idx] if gold_value_idx is not None else None,
-                        'usd_value': row[usd_value_idx] if usd_value_idx is not None else None,
-                        'total_wealth': row[total_wealth_idx] if total_wealth_idx is not None else None,
-                    }
-                    data.append(entry)
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
+    wait_for_pending_saves()
+    # A missing file loads as no rows, so there is nothing to check up front
+    try:
+        headers, rows = load_financial_rows(file_path)
+        
+        # Get column indices
+        header_index = get_header_index(headers)
+        timestamp_idx = header_index.get(COL_TIMESTAMP)
+        gold_24k_holdings_idx = header_index.get(COL_GOLD_24K_HOLDINGS)
+        gold_21k_holdings_idx = header_index.get(COL_GOLD_21K_HOLDINGS)
+        usd_balance_idx = header_index.get(COL_USD_BALANCE)
+        gold_24k_price_idx = header_index.get(COL_GOLD_24K_PRICE)
+        gold_21k_price_idx = header_index.get(COL_GOLD_21K_PRICE)
+        usd_rate_idx = header_index.get(COL_OFFICIAL_USD_RATE)
+        gold_value_idx = header_index.get(COL_TOTAL_GOLD_VALUE)
+        usd_value_idx = header_index.get(COL_TOTAL_USD_VALUE)
+        total_wealth_idx = header_index.get(COL_TOTAL_WEALTH)
+        
+        # The CSV reader doesn't pad short rows (a hand edit or a torn append), so pad them
+        # to the header width here instead of failing the whole response on one of them
+        width = len(headers)
+        for row in rows:
+            if row and any(cell is not None for cell in row):
+                if len(row) < width:
+                    row = row + (None,) * (width - len(row))
+                entry = {
+                    'timestamp': row[timestamp_idx] if timestamp_idx is not None else None,
+                    'gold_holdings_24k': row[gold_24k_holdings_idx] if gold_24k_holdings_idx is not None else None,
+                    'gold_holdings_21k': row[gold_21k_holdings_idx] if gold_21k_holdings_idx is not None else None,
+                    'usd_balance': row[usd_balance_idx] if usd_balance_idx is not None else None,
+                    'gold_price_24k': row[gold_24k_price_idx] if gold_24k_price_idx is not None else None,
+                    'gold_price_21k': row[gold_21k_price_idx] if gold_21k_price_idx is not None else None,
+                    'usd_rate': row[usd_rate_idx] if usd_rate_idx is not None else None,
+                    'gold_value': row[gold_value_idx] if gold_value_idx is not None else None,
+                    'usd_value': row[usd_value_idx] if usd_value_idx is not None else None,
+                    'total_wealth': row[total_wealth_idx] if total_wealth_idx is not None else None,
+                }
+                data.append(entry)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
     
     return jsonify({
         'data': data,
@@ -403,41 +511,33 @@ def delete_entry(timestamp):
         if not timestamp or len(timestamp) == 0:
             return jsonify({"error": "Invalid timestamp"}), 400
         
-        file_path = "financial_summary.xlsx"
-        if not os.path.exists(file_path):
-            return jsonify({"error": "No data file found"}), 404
-        
+        file_path = FINANCIAL_SUMMARY_CSV
+        wait_for_pending_saves()
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
-            headers = [cell.value for cell in sheet[1]]
-            
-            # Find timestamp column by name instead of index
-            timestamp_col_index = get_column_index(headers, COL_TIMESTAMP)
-            if timestamp_col_index is None:
-                # Fallback: try to find by old column name
-                timestamp_col_index = get_column_index(headers, "Date")
-                if timestamp_col_index is None:
-                    timestamp_col_index = 0  # Final fallback to first column
-            
-            # Search for matching timestamp
-            found = False
-            for row in sheet.iter_rows(min_row=2):  # Skip header row
-                if row[timestamp_col_index].value == timestamp:
-                    sheet.delete_rows(row[timestamp_col_index].row)
-                    workbook.save(file_path)
-                    found = True
-                    break
-            
-            if not found:
+            if not delete_financial_entry(timestamp, file_path):
                 return jsonify({"error": "Entry not found"}), 404
+            _invalidate_history_cache()
             
             return jsonify(success=True)
+        except FileNotFoundError:
+            return jsonify({"error": "No data file found"}), 404
         except Exception as e:
             return jsonify({"error": f"Database error: {str(e)}"}), 500
     except Exception as e:
         return jsonify({"error": "An unexpected error occurred"}), 500
 
+@app.route("/export")
+@login_required
+def export_xlsx():
+    """Download the financial summary as an Excel file (regenerated from the CSV store if stale)"""
+    try:
+        wait_for_pending_saves()
+        if not rebuild_excel_if_stale():
+            return jsonify({"error": "No data file found"}), 404
+        return send_file(os.path.abspath(FINANCIAL_SUMMARY_FILE), as_attachment=True)
+    except Exception as e:
+        return jsonify({"error": f"Export error: {str(e)}"}), 500
+
 def background_price_checker():
     """Background thread: gold polls (weekdays) + daily Telegram digest at Cairo time (no extra API)."""
     time.sleep(30)
@@ -457,6 +557,8 @@ def background_price_checker():
                 if delay:
                     time.sleep(delay)
                 check_all_prices()
+            # Keep the Excel copy in sync with the CSV store (no-op when nothing changed)
+            rebuild_excel_if_stale()
         except Exception as e:
             print(f"Error in background price checker: {e}")
             time.sleep(60)
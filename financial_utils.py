@@ -1,8 +1,25 @@
 import requests
 import os
+import csv
+import json
+import time
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from openpyxl import Workbook, load_workbook
 from datetime import datetime
+from http_session import HTTP_SESSION, HTTP_TIMEOUT  # shared with telegram_utils
+try:
+    import orjson  # optional: faster JSON decoding/encoding (API payloads, history files)
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        """Compact JSON as UTF-8 bytes, matching orjson.dumps()."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
 # Load environment variables
 load_dotenv()
@@ -11,11 +28,35 @@ GOLD_API_KEYS = os.getenv("GOLD_API_KEYS")
 
 # API Endpoints
 GOLD_API_URL = "https://www.goldapi.io/api/XAU/EGP"
-CB_EGP_USD_URL = "https://api.exchangerate-api.com/v4/latest/USD"  # Central Bank Rate
-CB_EGP_GBP_URL = "https://api.exchangerate-api.com/v4/latest/GBP"  # GBP to EGP Rate
+CB_EGP_USD_URL = "https://api.exchangerate-api.com/v4/latest/USD"  # Central Bank Rate (USD base; GBP is derived from it)
 
 # Constants
 TROY_OUNCE_TO_GRAM = 31.1035  # 1 Troy Ounce = 31.1035 grams
+GOLD_21K_RATIO = 21 / 24  # 21k gold is 21/24 pure; used when the API has no 21k price
+
+# Last successful API results, shared by the background checker and the web app
+PRICE_CACHE_TTL = int(os.getenv("PRICE_CACHE_TTL", "300"))  # seconds
+FX_RATES_TTL = 30  # seconds; lets back-to-back USD and GBP lookups share one request
+_PRICE_CACHE = {}  # "gold" -> (fetched_at, (price_24k, price_21k)), "usd"/"gbp" -> (fetched_at, rate)
+_PRICE_CACHE_LOCK = threading.Lock()
+# The price cache is mirrored to disk so a restart within the TTL doesn't re-query the APIs
+RATES_CACHE_FILE = ".rates_cache.json"
+_FX_VALIDATORS = {}  # "etag"/"last_modified" of the last FX response and the table parsed from it
+
+# Storage: the CSV is the append-only source of truth, the Excel file is generated from it
+FINANCIAL_SUMMARY_CSV = "financial_summary.csv"
+FINANCIAL_SUMMARY_FILE = "financial_summary.xlsx"
+_STORE_LOCK = threading.Lock()  # Serializes writes from the web app and the background checker
+_ROWS_CACHE = {}  # file_path -> ((mtime_ns, size), raw_rows, deleted, headers, rows)
+_ROWS_CACHE_LOCK = threading.Lock()
+# Deleted entries are tombstoned in a side file and filtered out at read time; the CSV
+# itself is only rewritten once enough tombstones pile up.
+# A tombstone is (timestamp, n): the n-th row (0-based, in file order) carrying that
+# timestamp, so a later row that repeats a deleted one's timestamp stays visible.
+_DELETED_ENTRIES = {}  # file_path -> frozenset of (timestamp, occurrence) tombstones
+_TIMESTAMP_INDEX = {}  # file_path -> (rows, timestamp -> occurrence of its first visible row)
+_TIMESTAMP_COLUMN = {}  # file_path -> (headers, timestamp column index)
+TOMBSTONE_COMPACT_THRESHOLD = 100
 
 # Column name constants for Excel file structure
 COL_TIMESTAMP = "Timestamp"
@@ -42,6 +83,68 @@ NEW_FORMAT_HEADERS = [
     COL_TOTAL_USD_VALUE,
     COL_TOTAL_WEALTH
 ]
+NEW_FORMAT_INDEX = {header: i for i, header in enumerate(NEW_FORMAT_HEADERS)}
+
+def _load_rates_cache():
+    """
+    Seeds the in-memory price cache from RATES_CACHE_FILE. Entries are stored with
+    wall-clock timestamps and converted to the monotonic clock the cache ages on.
+    """
+    try:
+        with open(RATES_CACHE_FILE, "rb") as f:
+            stored = json_loads(f.read())
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        print(f"Error reading rates cache: {e}")
+        return
+    offset = time.monotonic() - time.time()
+    with _PRICE_CACHE_LOCK:
+        for name, entry in stored.items():
+            value = entry.get("value")
+            if isinstance(value, list):
+                value = tuple(value)  # JSON has no tuples; gold prices are a (24k, 21k) pair
+            _PRICE_CACHE[name] = (entry.get("ts", 0) + offset, value)
+
+def _save_rates_cache():
+    """Writes the price cache to RATES_CACHE_FILE atomically. Call with _PRICE_CACHE_LOCK held."""
+    offset = time.time() - time.monotonic()
+    stored = {name: {"value": value, "ts": fetched_at + offset} for name, (fetched_at, value) in _PRICE_CACHE.items()}
+    tmp_path = RATES_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps(stored))
+        os.replace(tmp_path, RATES_CACHE_FILE)
+    except OSError as e:
+        print(f"Error writing rates cache: {e}")
+
+def _remember_prices(values):
+    """Caches {name: value} results from one fetch and persists them with a single write."""
+    # monotonic: cache ages aren't affected by wall-clock/NTP adjustments
+    fetched_at = time.monotonic()
+    with _PRICE_CACHE_LOCK:
+        for name, value in values.items():
+            _PRICE_CACHE[name] = (fetched_at, value)
+        _save_rates_cache()
+
+def _remember_price(name, value):
+    _remember_prices({name: value})
+
+def _cached_price(name, ttl):
+    """Returns the cached value if it was fetched less than ttl seconds ago, else None."""
+    with _PRICE_CACHE_LOCK:
+        entry = _PRICE_CACHE.get(name)
+    if entry and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    return None
+
+def clear_price_cache():
+    """Forgets every cached price/rate so the next cached getter call fetches fresh data."""
+    with _PRICE_CACHE_LOCK:
+        _PRICE_CACHE.clear()
+        _save_rates_cache()
+
+_load_rates_cache()
 
 # Function to fetch gold prices in EGP per gram (both 24k and 21k)
 def _parse_gold_api_keys():
@@ -68,6 +171,12 @@ def _parse_gold_api_keys():
     return unique
 
 
+# Keys (and their request headers) only change with the environment, so resolve them once
+_GOLD_KEY_HEADERS = [{"x-access-token": k} for k in _parse_gold_api_keys()]
+if not _GOLD_KEY_HEADERS:
+    print("Warning: GoldAPI key not configured (set GOLD_API_KEY or GOLD_API_KEYS).")
+
+
 def _looks_like_quota_or_rate_limit(response):
     if response is None:
         return False
@@ -90,32 +199,28 @@ def get_gold_price():
     Returns a tuple (price_24k, price_21k) or (None, None) on error.
     If 21k price is not available from API, calculates it as 21/24 of 24k price.
     """
-    keys = _parse_gold_api_keys()
-    if not keys:
-        print("Warning: GoldAPI key not configured (set GOLD_API_KEY or GOLD_API_KEYS).")
-        return (None, None)
+    key_headers = _GOLD_KEY_HEADERS
+    if not key_headers:
+        return (None, None)  # no request without a key; warned once at import
 
-    def _request_with_key(api_key):
-        headers = {
-            "x-access-token": api_key,
-            "Content-Type": "application/json",
-        }
-        return requests.get(GOLD_API_URL, headers=headers, timeout=10)
+    def _request_with_key(headers):
+        # Session-level headers are merged in by requests; only the key varies per call
+        return HTTP_SESSION.get(GOLD_API_URL, headers=headers, timeout=HTTP_TIMEOUT)
 
     try:
         # Primary key
-        response = _request_with_key(keys[0])
-        if not response.ok and len(keys) > 1 and _looks_like_quota_or_rate_limit(response):
+        response = _request_with_key(key_headers[0])
+        if not response.ok and len(key_headers) > 1 and _looks_like_quota_or_rate_limit(response):
             # Fallback: rotate to next key(s) only for quota/rate-limit type failures
             last_status = response.status_code
-            for i, k in enumerate(keys[1:], start=2):
+            for i, headers in enumerate(key_headers[1:], start=2):
                 print(f"GoldAPI primary key quota/limit hit (status={last_status}). Retrying with key #{i}...")
-                response = _request_with_key(k)
+                response = _request_with_key(headers)
                 if response.ok or not _looks_like_quota_or_rate_limit(response):
                     break
 
         response.raise_for_status()
-        data = response.json()
+        data = json_loads(response.content)
         price_gram_24k = data.get("price_gram_24k", None)
         price_gram_21k = data.get("price_gram_21k", None)
 
@@ -125,76 +230,448 @@ def get_gold_price():
             if price_gram_21k:
                 price_21k = round(price_gram_21k, 2)
             else:
-                price_21k = round(price_gram_24k * (21 / 24), 2)
+                price_21k = round(price_gram_24k * GOLD_21K_RATIO, 2)
+            _remember_price("gold", (price_24k, price_21k))
             return (price_24k, price_21k)
         return (None, None)
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error fetching gold price: {e}")
         return (None, None)
 
-# Function to fetch official USD to EGP rate
-def get_official_usd_rate():
+def _fx_cache_values(fx):
+    """Price cache entries for one FX table: the table itself plus the usd/gbp rates."""
+    values = {"fx": fx, "usd": fx["USD"]}
+    if fx["GBP"] is not None:
+        values["gbp"] = fx["GBP"]
+    return values
+
+# Function to fetch the USD and GBP to EGP rates with one request
+def get_fx_rates(ttl=FX_RATES_TTL):
+    """
+    Fetches the USD-based rate table once and returns {"USD": EGP per USD, "GBP": EGP per GBP}.
+    GBP is the cross rate EGP/GBP from the same table. A table younger than ttl seconds
+    is reused. Returns None on error.
+    """
+    cached = _cached_price("fx", ttl)
+    if cached is not None:
+        return cached
+    # Conditional GET: an unchanged table comes back as an empty 304
+    headers = {}
+    if _FX_VALIDATORS.get("etag"):
+        headers["If-None-Match"] = _FX_VALIDATORS["etag"]
+    if _FX_VALIDATORS.get("last_modified"):
+        headers["If-Modified-Since"] = _FX_VALIDATORS["last_modified"]
     try:
-        response = requests.get(CB_EGP_USD_URL)
+        response = HTTP_SESSION.get(CB_EGP_USD_URL, headers=headers, timeout=HTTP_TIMEOUT)
+        if response.status_code == 304 and _FX_VALIDATORS.get("fx"):
+            _remember_prices(_fx_cache_values(_FX_VALIDATORS["fx"]))
+            return _FX_VALIDATORS["fx"]
         response.raise_for_status()
-        return round(response.json()["rates"].get("EGP", 0), 2)
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching official USD rate: {e}")
+        rates = json_loads(response.content)["rates"]
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Error fetching exchange rates: {e}")
         return None
 
+    egp_per_usd = rates.get("EGP", 0)
+    gbp_per_usd = rates.get("GBP")  # USD-based table: pounds per dollar
+    fx = {
+        "USD": round(egp_per_usd, 2),
+        "GBP": round(egp_per_usd / gbp_per_usd, 2) if gbp_per_usd else None,
+    }
+    _FX_VALIDATORS.update(
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        fx=fx,
+    )
+    _remember_prices(_fx_cache_values(fx))
+    return fx
+
+# Function to fetch official USD to EGP rate
+def get_official_usd_rate():
+    rates = get_fx_rates()
+    return rates["USD"] if rates else None
+
+def get_gold_price_cached(ttl=PRICE_CACHE_TTL):
+    """
+    Like get_gold_price(), but reuses the last successful result (from any caller,
+    including the background checker) if it is younger than ttl seconds.
+    """
+    cached = _cached_price("gold", ttl)
+    if cached is not None:
+        return cached
+    return get_gold_price()
+
+def get_official_usd_rate_cached(ttl=PRICE_CACHE_TTL):
+    """Like get_official_usd_rate(), but reuses a result younger than ttl seconds."""
+    cached = _cached_price("usd", ttl)
+    if cached is not None:
+        return cached
+    return get_official_usd_rate()
+
+def warm_http_session():
+    """
+    Opens the pooled HTTPS connection ahead of the first real request by fetching the
+    USD rate (which also seeds the price cache). GoldAPI is not touched: calls count
+    against the key's quota.
+    """
+    threading.Thread(target=get_official_usd_rate, daemon=True).start()
+
+# Worker threads for fetching from the different rate APIs at the same time
+_FETCH_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="rate-fetch")
+
+def fetch_concurrently(*fetchers):
+    """
+    Calls the given zero-argument fetch functions in parallel and returns their
+    results in the same order, so the wait is the slowest request instead of the sum.
+    Each fetcher handles its own request errors and returns None-style values on failure;
+    a fetcher that raises anyway yields None so the others' results still come back.
+    """
+    futures = [_FETCH_POOL.submit(fetcher) for fetcher in fetchers]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            print(f"Error fetching rates: {e}")
+            results.append(None)
+    return results
+
+def fetch_all_rates(ttl=PRICE_CACHE_TTL):
+    """
+    Fetches every tracked price in one batch (GoldAPI and the FX table in parallel) and
+    returns {"gold_24k", "gold_21k", "usd", "gbp"}; a failed source leaves its keys None.
+    Results younger than ttl seconds are reused; pass ttl=0 to force fresh requests.
+    """
+    gold, fx = fetch_concurrently(
+        lambda: get_gold_price_cached(ttl) if ttl > 0 else get_gold_price(),
+        lambda: get_fx_rates(ttl),
+    )
+    gold_24k, gold_21k = gold or (None, None)
+    fx = fx or {}
+    return {"gold_24k": gold_24k, "gold_21k": gold_21k, "usd": fx.get("USD"), "gbp": fx.get("GBP")}
+
 # Function to fetch GBP to EGP rate
 def get_gbp_rate():
     """
     Fetches GBP to EGP exchange rate.
     Returns the rate as a float or None on error.
     """
-    try:
-        response = requests.get(CB_EGP_GBP_URL)
-        response.raise_for_status()
-        return round(response.json()["rates"].get("EGP", 0), 2)
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching GBP rate: {e}")
+    rates = get_fx_rates()
+    return rates["GBP"] if rates else None
+
+def get_gbp_rate_cached(ttl=PRICE_CACHE_TTL):
+    """Like get_gbp_rate(), but reuses a result younger than ttl seconds."""
+    cached = _cached_price("gbp", ttl)
+    if cached is not None:
+        return cached
+    return get_gbp_rate()
+
+# Function to parse a CSV cell back into a Python value
+def _parse_csv_value(value):
+    """
+    Converts a CSV cell back to the value that was written.
+    Empty cells become None, numeric cells become floats, anything else stays a string.
+    """
+    if value == "":
         return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
 
-# Function to save data to Excel
+# Function to find the timestamp column of a stored file
+def _timestamp_column(headers):
+    """Returns the timestamp column index, falling back to the old "Date" name, then to 0."""
+    index = get_column_index(headers, COL_TIMESTAMP)
+    if index is None:
+        index = get_column_index(headers, "Date")
+    return 0 if index is None else index
+
+def _timestamp_column_for(file_path, headers):
+    """_timestamp_column(), memoized per file until its header row is re-read."""
+    cached = _TIMESTAMP_COLUMN.get(file_path)
+    if cached and cached[0] is headers:
+        return cached[1]
+    index = _timestamp_column(headers)
+    _TIMESTAMP_COLUMN[file_path] = (headers, index)
+    return index
+
+def _deleted_entries_path(file_path):
+    return os.path.splitext(file_path)[0] + ".deleted.json"
+
+def _tombstone(entry):
+    """(timestamp, occurrence) from a tombstone file entry; a bare timestamp means its first row."""
+    if isinstance(entry, list):
+        return (entry[0], entry[1])
+    return (entry, 0)
+
+# Function to get the tombstoned rows of a CSV store
+def _get_deleted_entries(file_path):
+    """
+    Returns the frozenset of (timestamp, occurrence) tombstones for a CSV store, loading
+    the tombstone file on first use. The set is replaced, never mutated, on delete.
+    """
+    deleted = _DELETED_ENTRIES.get(file_path)
+    if deleted is None:
+        try:
+            with open(_deleted_entries_path(file_path), "rb") as f:
+                deleted = frozenset(_tombstone(entry) for entry in json_loads(f.read()))
+        except FileNotFoundError:
+            deleted = frozenset()
+        except (OSError, ValueError) as e:
+            print(f"Error reading deleted entries for {file_path}: {e}")
+            deleted = frozenset()
+        _DELETED_ENTRIES[file_path] = deleted
+    return deleted
+
+def _write_deleted_entries(file_path, deleted):
+    """Persists the tombstone set atomically and makes it the active one."""
+    path = _deleted_entries_path(file_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json_dumps(sorted(deleted)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _DELETED_ENTRIES[file_path] = deleted
+
+# Function to read all rows from the CSV store
+def load_financial_rows(file_path=FINANCIAL_SUMMARY_CSV):
+    """
+    Reads the financial summary CSV.
+    Returns a tuple (headers, rows) where rows is a list of tuples in file order.
+    Blank lines and deleted (tombstoned) entries are skipped.
+    Returns ([], []) if the file does not exist.
+
+    The parsed result is cached per file and reused until the file's mtime or size
+    changes or an entry is deleted, so repeated reads cost one stat() call.
+    Callers must not modify the returned lists.
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return [], []
+    key = (st.st_mtime_ns, st.st_size)
+
+    with _ROWS_CACHE_LOCK:
+        deleted = _get_deleted_entries(file_path)
+        cached = _ROWS_CACHE.get(file_path)
+        if cached and cached[0] == key:
+            if cached[2] is deleted:
+                return cached[3], cached[4]
+            headers, raw_rows = cached[3], cached[1]
+        else:
+            try:
+                with open(file_path, "r", newline="") as f:
+                    reader = csv.reader(f)
+                    headers = next(reader, [])
+                    raw_rows = [tuple(_parse_csv_value(value) for value in row) for row in reader if row]
+            except FileNotFoundError:
+                return [], []
+
+        rows = raw_rows
+        if deleted:
+            ts_col = _timestamp_column_for(file_path, headers)
+            rows = []
+            seen = {}  # timestamp -> rows carrying it so far
+            for row in raw_rows:
+                if ts_col < len(row):
+                    timestamp = row[ts_col]
+                    occurrence = seen.get(timestamp, 0)
+                    seen[timestamp] = occurrence + 1
+                    if (timestamp, occurrence) in deleted:
+                        continue
+                rows.append(row)
+        _ROWS_CACHE[file_path] = (key, raw_rows, deleted, headers, rows)
+        return headers, rows
+
+# Function to rewrite the CSV store in one go
+def _write_financial_rows(headers, rows, file_path=FINANCIAL_SUMMARY_CSV):
+    """Writes all rows to a temp file and atomically replaces the CSV store."""
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    os.replace(tmp_path, file_path)
+
+# Function to migrate an existing Excel file to the CSV store
+def migrate_excel_to_csv(xlsx_path=FINANCIAL_SUMMARY_FILE, csv_path=FINANCIAL_SUMMARY_CSV):
+    """
+    One-time migration: if the CSV store does not exist yet but an Excel file does,
+    copy every row of the Excel file into the CSV store.
+    """
+    if os.path.exists(csv_path) or not os.path.exists(xlsx_path):
+        return
+    # Single streaming pass: each row goes straight from the read-only sheet to the CSV
+    migrated = 0
+    tmp_path = csv_path + ".tmp"
+    with _STORE_LOCK:
+        workbook = load_workbook(xlsx_path, read_only=True, data_only=True)
+        try:
+            row_iter = workbook.active.iter_rows(values_only=True)
+            headers = list(next(row_iter, ()))
+            with open(tmp_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(headers or NEW_FORMAT_HEADERS)
+                for row in row_iter:
+                    if row:
+                        writer.writerow(row)
+                        migrated += 1
+        finally:
+            workbook.close()
+        os.replace(tmp_path, csv_path)
+    print(f"Migrated {migrated} rows from {xlsx_path} to {csv_path}")
+
+# Function to regenerate the Excel file from the CSV store
+def rebuild_excel_if_stale(csv_path=FINANCIAL_SUMMARY_CSV, xlsx_path=FINANCIAL_SUMMARY_FILE):
+    """
+    Regenerates the Excel file from the CSV store if the CSV is newer.
+    Uses a write-only workbook so rows are streamed instead of held in memory
+    (openpyxl streams the XML through lxml when it is installed).
+    Returns True if the Excel file exists and is up to date afterwards.
+    """
+    # One stat per file; a missing file raises instead of needing an exists() check first
+    try:
+        source_mtime = os.path.getmtime(csv_path)
+    except FileNotFoundError:
+        return os.path.exists(xlsx_path)
+    try:
+        source_mtime = max(source_mtime, os.path.getmtime(_deleted_entries_path(csv_path)))
+    except FileNotFoundError:
+        pass
+    try:
+        if os.path.getmtime(xlsx_path) >= source_mtime:
+            return True
+    except FileNotFoundError:
+        pass
+
+    with _STORE_LOCK:
+        headers, rows = load_financial_rows(csv_path)
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(headers or NEW_FORMAT_HEADERS)
+        for row in rows:
+            sheet.append(row)
+        # Save next to the target and swap it in, so /export never serves a half-written file
+        tmp_path = xlsx_path + ".tmp"
+        workbook.save(tmp_path)
+        os.replace(tmp_path, xlsx_path)
+    return True
+
+# Function to append a batch of rows to the CSV store
+def append_financial_rows(rows, file_path=FINANCIAL_SUMMARY_CSV, fsync=False):
+    """
+    Appends rows (10 values each, in NEW_FORMAT_HEADERS order) to the CSV store with a
+    single open/write. Writes the header first if the file is new or empty. With fsync=True the
+    data is flushed to disk before returning.
+    """
+    with _STORE_LOCK:
+        with open(file_path, "a+", newline="") as f:
+            writer = csv.writer(f)
+            # An append-mode handle starts at the end of the file, so position 0 means
+            # the file is new (or empty) and needs its header; no separate stat() call
+            end = f.tell()
+            if end == 0:
+                writer.writerow(NEW_FORMAT_HEADERS)
+            else:
+                # Terminate a partial line left by an interrupted write so it can't swallow ours
+                f.seek(end - 1)
+                if f.read(1) != "\n":
+                    f.write(writer.dialect.lineterminator)
+            writer.writerows(rows)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+# Function to save data to the financial summary
 def save_to_excel(timestamp, gold_holdings_24k, gold_holdings_21k, usd_balance, gold_price_24k, gold_price_21k, official_usd_rate, total_gold_value_egp, total_usd_value_egp, total_wealth_egp):
     """
-    Saves financial data to Excel file (10 columns).
+    Appends one row of financial data (10 columns) to the CSV store.
+    The Excel file is regenerated from the CSV on demand (see rebuild_excel_if_stale).
     """
-    file_path = "financial_summary.xlsx"
-    
-    if os.path.exists(file_path):
-        workbook = load_workbook(file_path)
-        sheet = workbook.active
-    else:
-        workbook = Workbook()
-        sheet = workbook.active
-        sheet.append(NEW_FORMAT_HEADERS)
-
     # Append new row with all 10 columns
-    sheet.append([
+    append_financial_rows([(
         timestamp,
-        gold_holdings_24k if gold_holdings_24k is not None else None,
-        gold_holdings_21k if gold_holdings_21k is not None else None,
+        gold_holdings_24k,
+        gold_holdings_21k,
         usd_balance,
-        gold_price_24k if gold_price_24k is not None else None,
-        gold_price_21k if gold_price_21k is not None else None,
+        gold_price_24k,
+        gold_price_21k,
         official_usd_rate,
         total_gold_value_egp,
         total_usd_value_egp,
         total_wealth_egp
-    ])
-    workbook.save(file_path)
+    )])
 
-def get_last_holdings(file_path="financial_summary.xlsx"):
+# Function to delete an entry from the financial summary
+def delete_financial_entry(timestamp, file_path=FINANCIAL_SUMMARY_CSV):
     """
-    Gets the most recent snapshot (holdings + market rates + totals) from the Excel file.
-    Returns a dict with:
-      - gold_24k, gold_21k, usd_balance
-      - gold_price_24k, gold_price_21k, official_usd_rate
-      - total_gold_value_egp, total_usd_value_egp, total_wealth_egp
-      - timestamp
-    If anything can't be found, values are returned as None.
+    Tombstones the first remaining entry with the given timestamp; the row disappears
+    from every reader straight away and is physically removed by compact_deleted_entries()
+    once more than TOMBSTONE_COMPACT_THRESHOLD deletions have accumulated.
+    Other rows sharing the timestamp are left alone.
+    Returns True if a row was removed, False if no matching row was found.
+    Raises FileNotFoundError if the CSV store does not exist.
+    """
+    with _STORE_LOCK:
+        headers, rows = load_financial_rows(file_path)
+        if not headers:
+            raise FileNotFoundError(file_path)
+        cached_rows = _ROWS_CACHE.get(file_path)
+        if not rows or cached_rows is None:
+            return False
+        deleted = _get_deleted_entries(file_path)
+
+        # Timestamp lookup index, rebuilt only when the loaded rows change
+        cached = _TIMESTAMP_INDEX.get(file_path)
+        if cached and cached[0] is rows:
+            first_visible = cached[1]
+        else:
+            ts_col = _timestamp_column_for(file_path, headers)
+            first_visible = {}
+            seen = {}
+            for row in cached_rows[1]:  # every row in the file, deleted ones included
+                if ts_col < len(row):
+                    ts = row[ts_col]
+                    occurrence = seen.get(ts, 0)
+                    seen[ts] = occurrence + 1
+                    if (ts, occurrence) not in deleted:
+                        first_visible.setdefault(ts, occurrence)
+            _TIMESTAMP_INDEX[file_path] = (rows, first_visible)
+
+        occurrence = first_visible.get(timestamp)
+        if occurrence is None:
+            return False
+
+        deleted = deleted | {(timestamp, occurrence)}
+        _write_deleted_entries(file_path, deleted)
+
+    if len(deleted) > TOMBSTONE_COMPACT_THRESHOLD:
+        threading.Thread(target=compact_deleted_entries, args=(file_path,), daemon=True).start()
+    return True
+
+# Function to drop tombstoned rows from the CSV store for good
+def compact_deleted_entries(file_path=FINANCIAL_SUMMARY_CSV):
+    """Rewrites the CSV store without deleted entries and clears the tombstone file."""
+    try:
+        with _STORE_LOCK:
+            if not _get_deleted_entries(file_path):
+                return
+            headers, rows = load_financial_rows(file_path)
+            _write_financial_rows(headers, rows, file_path)
+            _DELETED_ENTRIES[file_path] = frozenset()
+            try:
+                os.remove(_deleted_entries_path(file_path))
+            except FileNotFoundError:
+                pass
+    except Exception as e:
+        print(f"Error compacting deleted entries: {e}")
+
+def last_holdings_from_rows(existing_headers, rows):
+    """
+    Builds the most recent snapshot dict (see get_last_holdings) from rows the caller
+    has already loaded, so request handlers don't have to read the store a second time.
     """
     default = {
         "timestamp": None,
@@ -209,46 +686,56 @@ def get_last_holdings(file_path="financial_summary.xlsx"):
         "total_wealth_egp": None,
     }
 
-    if not os.path.exists(file_path):
+    headers = existing_headers if len(existing_headers) == 10 else NEW_FORMAT_HEADERS
+
+    # Find the last non-empty row
+    last_row = None
+    for row in reversed(rows):
+        if any(cell is not None for cell in row):
+            last_row = row
+            break
+
+    if not last_row:
         return default
-    
+
+    header_index = get_header_index(headers)
+
+    def _get(name):
+        idx = header_index.get(name)
+        if idx is None or idx >= len(last_row):
+            return None
+        return last_row[idx]
+
+    return {
+        "timestamp": _get(COL_TIMESTAMP),
+        "gold_24k": _get(COL_GOLD_24K_HOLDINGS),
+        "gold_21k": _get(COL_GOLD_21K_HOLDINGS),
+        "usd_balance": _get(COL_USD_BALANCE),
+        "gold_price_24k": _get(COL_GOLD_24K_PRICE),
+        "gold_price_21k": _get(COL_GOLD_21K_PRICE),
+        "official_usd_rate": _get(COL_OFFICIAL_USD_RATE),
+        "total_gold_value_egp": _get(COL_TOTAL_GOLD_VALUE),
+        "total_usd_value_egp": _get(COL_TOTAL_USD_VALUE),
+        "total_wealth_egp": _get(COL_TOTAL_WEALTH),
+    }
+
+def get_last_holdings(file_path=FINANCIAL_SUMMARY_CSV):
+    """
+    Gets the most recent snapshot (holdings + market rates + totals) from the financial summary.
+    Returns a dict with:
+      - gold_24k, gold_21k, usd_balance
+      - gold_price_24k, gold_price_21k, official_usd_rate
+      - total_gold_value_egp, total_usd_value_egp, total_wealth_egp
+      - timestamp
+    If anything can't be found, values are returned as None.
+    """
     try:
-        workbook = load_workbook(file_path)
-        sheet = workbook.active
-        
-        existing_headers = [cell.value for cell in sheet[1]]
-        headers = existing_headers if len(existing_headers) == 10 else NEW_FORMAT_HEADERS
-
-        # Find the last non-empty row
-        last_row = None
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if row and any(cell is not None for cell in row):
-                last_row = row
-        
-        if not last_row:
-            return default
-
-        def _get(idx):
-            if idx is None or idx >= len(last_row):
-                return None
-            return last_row[idx]
-
-        return {
-            "timestamp": _get(get_column_index(headers, COL_TIMESTAMP)),
-            "gold_24k": _get(get_column_index(headers, COL_GOLD_24K_HOLDINGS)),
-            "gold_21k": _get(get_column_index(headers, COL_GOLD_21K_HOLDINGS)),
-            "usd_balance": _get(get_column_index(headers, COL_USD_BALANCE)),
-            "gold_price_24k": _get(get_column_index(headers, COL_GOLD_24K_PRICE)),
-            "gold_price_21k": _get(get_column_index(headers, COL_GOLD_21K_PRICE)),
-            "official_usd_rate": _get(get_column_index(headers, COL_OFFICIAL_USD_RATE)),
-            "total_gold_value_egp": _get(get_column_index(headers, COL_TOTAL_GOLD_VALUE)),
-            "total_usd_value_egp": _get(get_column_index(headers, COL_TOTAL_USD_VALUE)),
-            "total_wealth_egp": _get(get_column_index(headers, COL_TOTAL_WEALTH)),
-        }
+        existing_headers, rows = load_financial_rows(file_path)
+        return last_holdings_from_rows(existing_headers, rows)
     except Exception as e:
         print(f"Error reading last holdings: {e}")
-    
-    return default
+
+    return last_holdings_from_rows([], [])
 
 # Function to normalize rows to dictionary format
 def normalize_row_to_new_format(row, headers):
@@ -266,16 +753,43 @@ def normalize_row_to_new_format(row, headers):
         # Row has more than expected columns, return as dictionary
         return dict(zip(headers, row))
 
+# Function to map target headers onto the column positions of a stored file
+def build_column_map(existing_headers, headers):
+    """
+    Returns a list with, for each header in `headers`, its index in `existing_headers`
+    (or None when the stored file has no such column). Compute it once per file and
+    index rows with it instead of building a dict per row via normalize_row_to_new_format.
+    """
+    positions = {}
+    for i, name in enumerate(existing_headers):
+        positions[name] = i  # last occurrence wins, same as dict(zip(...))
+    return [positions.get(header) for header in headers]
+
+# Function to get the name -> position map of a header row
+def get_header_index(headers):
+    """
+    Returns a dict mapping column names to their index in `headers` (first occurrence
+    wins, like list.index). Callers that need several columns should fetch this once
+    and use .get() on it instead of calling get_column_index repeatedly.
+    """
+    if headers is NEW_FORMAT_HEADERS:
+        return NEW_FORMAT_INDEX
+    return _header_index(tuple(headers))
+
+@lru_cache(maxsize=4)
+def _header_index(headers):
+    index = {}
+    for i, header in enumerate(headers):
+        index.setdefault(header, i)
+    return index
+
 # Function to get column index by name
 def get_column_index(headers, column_name):
     """
     Returns the index of a column by its name.
     Returns None if column not found.
     """
-    try:
-        return headers.index(column_name)
-    except ValueError:
-        return None
+    return get_header_index(headers).get(column_name)
 
 # Function to round numeric values to 2 decimal places
 def round_numeric_value(value, decimal_places=2):
@@ -283,14 +797,15 @@ def round_numeric_value(value, decimal_places=2):
     Rounds numeric values to specified decimal places.
     Returns None if value is None, otherwise returns rounded float or original value if not numeric.
     """
-    if value is None:
-        return None
-    try:
-        if isinstance(value, (int, float)):
-            return round(float(value), decimal_places)
-        return value
-    except (ValueError, TypeError):
-        return value
+    # Exact type checks first: values parsed from the CSV store are float or str/None
+    value_type = type(value)
+    if value_type is float:
+        return round(value, decimal_places)
+    if value_type is int:
+        return float(value)  # already whole, rounding can't change it
+    if isinstance(value, (int, float)):  # bool and other numeric subclasses
+        return round(float(value), decimal_places)
+    return value
 
 if __name__ == "__main__":
     # User assets
@@ -298,8 +813,8 @@ if __name__ == "__main__":
     USD = round(float(input("Enter your USD balance: ")), 2)  # Money in USD
 
     # Fetch prices
-    gold_price_24k, gold_price_21k = get_gold_price()
-    official_usd_rate = get_official_usd_rate()
+    rates = fetch_all_rates(ttl=0)
+    gold_price_24k, gold_price_21k, official_usd_rate = rates["gold_24k"], rates["gold_21k"], rates["usd"]
 
     if gold_price_24k and official_usd_rate:
         total_gold_value_egp = round(GOLD * gold_price_24k, 2)
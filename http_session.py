@@ -0,0 +1,24 @@
+"""
+Shared HTTP session for the price APIs and Telegram.
+Kept free of import-time side effects beyond building the session, so any module can use it.
+"""
+import atexit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Keeps TLS connections alive between calls. Connection errors and transient 5xx responses are
+# retried with backoff. 429 is deliberately not retried: GoldAPI quota responses must reach the
+# key rotation in financial_utils.get_gold_price().
+HTTP_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+_HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=("GET",),
+    raise_on_status=False,  # hand the last response back so raise_for_status() reports it
+)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({"Accept-Encoding": "gzip", "Content-Type": "application/json"})
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_HTTP_RETRY))
+atexit.register(HTTP_SESSION.close)
@@ -5,7 +5,7 @@ Call this function with an amount to get transfer recommendation
 from datetime import datetime
 import os
 from dotenv import load_dotenv
-from financial_utils import get_gbp_rate
+from financial_utils import get_gbp_rate_cached
 from telegram_utils import send_telegram_message
 from price_tracker import load_price_history
 load_dotenv()
@@ -56,16 +56,12 @@ def estimate_future_rate(current_rate, price_history, days_ahead):
     if len(price_history) < 7:
         return current_rate
     
-    recent_prices = price_history[-min(7, len(price_history)):]
-    prices = [p["price"] for p in recent_prices]
+    window = min(7, len(price_history))
     
-    if len(prices) >= 2:
-        daily_changes = []
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i-1]
-            daily_changes.append(change)
-        
-        avg_daily_change = sum(daily_changes) / len(daily_changes) if daily_changes else 0
+    if window >= 2:
+        # Mean of consecutive differences telescopes to (last - first) / (n - 1);
+        # indexing (not slicing) so a deque history works too
+        avg_daily_change = (price_history[-1]["price"] - price_history[-window]["price"]) / (window - 1)
         estimated_rate = current_rate + (avg_daily_change * days_ahead * 0.5)
         return max(estimated_rate, current_rate * 0.95)
     
@@ -85,7 +81,7 @@ def calculate_paypal_transfer(gbp_amount):
     if gbp_amount <= 0:
         return None
     
-    current_rate = get_gbp_rate()
+    current_rate = get_gbp_rate_cached()
     if not current_rate:
         return None
     
@@ -162,42 +158,49 @@ def format_paypal_transfer_message(decision_data):
         emoji = "🤷"
         title = "EITHER OPTION IS FINE"
     
-    message = f"{emoji} <b>{title}</b>\n"
-    message += "=" * 40 + "\n\n"
-    
-    message += f"💰 <b>GBP Amount:</b> {decision_data['gbp_balance']:.2f} GBP\n\n"
-    
-    message += "📊 <b>CURRENT OPTION (Manual Transfer Now):</b>\n"
-    message += f"   • PayPal Rate (est.): {decision_data['current_rate']:.2f} EGP/GBP\n"
-    message += f"   • Base Rate: {decision_data['base_current_rate']:.2f} EGP/GBP\n"
-    message += f"   • You'll receive: {decision_data['current_value_egp']:.2f} EGP\n"
-    message += f"   • Tax (manual): -{decision_data['manual_tax']:.2f} EGP\n"
-    message += f"   • <b>Net amount: {decision_data['current_value_after_tax']:.2f} EGP</b>\n\n"
-    message += "📅 <b>AUTO-TRANSFER OPTION (Wait until {})</b>:\n".format(decision_data['next_transfer_date'])
-    message += f"   • PayPal Est. Rate: {decision_data['estimated_future_rate']:.2f} EGP/GBP\n"
-    message += f"   • Base Est. Rate: {decision_data['base_estimated_future_rate']:.2f} EGP/GBP\n"
-    message += f"   • Tax: 0 EGP (no tax on auto-transfer)\n"
-    message += f"   • <b>Net amount: {decision_data['future_value_after_tax']:.2f} EGP</b>\n\n"
-    
-    message += "💡 <b>DECISION:</b>\n"
-    message += f"   {decision_data['reason']}\n\n"
+    lines = [
+        f"{emoji} <b>{title}</b>",
+        "=" * 40,
+        "",
+        f"💰 <b>GBP Amount:</b> {decision_data['gbp_balance']:.2f} GBP",
+        "",
+        "📊 <b>CURRENT OPTION (Manual Transfer Now):</b>",
+        f"   • PayPal Rate (est.): {decision_data['current_rate']:.2f} EGP/GBP",
+        f"   • Base Rate: {decision_data['base_current_rate']:.2f} EGP/GBP",
+        f"   • You'll receive: {decision_data['current_value_egp']:.2f} EGP",
+        f"   • Tax (manual): -{decision_data['manual_tax']:.2f} EGP",
+        f"   • <b>Net amount: {decision_data['current_value_after_tax']:.2f} EGP</b>",
+        "",
+        f"📅 <b>AUTO-TRANSFER OPTION (Wait until {decision_data['next_transfer_date']})</b>:",
+        f"   • PayPal Est. Rate: {decision_data['estimated_future_rate']:.2f} EGP/GBP",
+        f"   • Base Est. Rate: {decision_data['base_estimated_future_rate']:.2f} EGP/GBP",
+        "   • Tax: 0 EGP (no tax on auto-transfer)",
+        f"   • <b>Net amount: {decision_data['future_value_after_tax']:.2f} EGP</b>",
+        "",
+        "💡 <b>DECISION:</b>",
+        f"   {decision_data['reason']}",
+        "",
+    ]
     
     if decision_data['difference'] > 0:
-        message += f"   ✅ <b>Manual transfer is BETTER by {decision_data['difference']:.2f} EGP</b>\n"
+        lines.append(f"   ✅ <b>Manual transfer is BETTER by {decision_data['difference']:.2f} EGP</b>")
     elif decision_data['difference'] < 0:
-        message += f"   ⏳ <b>Auto-transfer is BETTER by {abs(decision_data['difference']):.2f} EGP</b>\n"
+        lines.append(f"   ⏳ <b>Auto-transfer is BETTER by {abs(decision_data['difference']):.2f} EGP</b>")
     else:
-        message += f"   🤷 <b>Difference is minimal ({decision_data['difference']:.2f} EGP)</b>\n"
-    
-    message += f"\n📆 <b>Days until auto-transfer:</b> {decision_data['days_until_auto']} days\n\n"
-    
-    message += "⚠️ <b>Note:</b> Future rate is an estimate based on recent trends.\n"
-    message += f"PayPal base spread: {decision_data['paypal_spread_pct']*100:.2f}%\n"
-    message += f"Safety buffer: {decision_data['paypal_safety_buffer_pct']*100:.2f}%\n"
-    message += f"Effective spread used: {decision_data['effective_paypal_spread_pct']*100:.2f}%\n"
-    message += "Actual rate on transfer day may vary."
-    
-    return message
+        lines.append(f"   🤷 <b>Difference is minimal ({decision_data['difference']:.2f} EGP)</b>")
+    
+    lines += [
+        "",
+        f"📆 <b>Days until auto-transfer:</b> {decision_data['days_until_auto']} days",
+        "",
+        "⚠️ <b>Note:</b> Future rate is an estimate based on recent trends.",
+        f"PayPal base spread: {decision_data['paypal_spread_pct']*100:.2f}%",
+        f"Safety buffer: {decision_data['paypal_safety_buffer_pct']*100:.2f}%",
+        f"Effective spread used: {decision_data['effective_paypal_spread_pct']*100:.2f}%",
+        "Actual rate on transfer day may vary.",
+    ]
+    
+    return "\n".join(lines)
 
 
 def check_paypal_transfer(gbp_amount, send_to_telegram=True):
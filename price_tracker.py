@@ -2,19 +2,30 @@
 Price tracking and notification system for buy/sell signals
 Uses real-world trading strategies: Moving Averages, RSI, Support/Resistance
 """
+import atexit
 import json
+import math
+from bisect import bisect_left, bisect_right
 import os
-from datetime import datetime
+import threading
+from collections import deque
+from datetime import datetime, time as dt_time, timedelta
+from functools import lru_cache
 from zoneinfo import ZoneInfo
-from datetime import time as dt_time, timedelta
-from financial_utils import get_gold_price, get_official_usd_rate, get_gbp_rate, save_to_excel, get_last_holdings
+from financial_utils import fetch_all_rates, json_dumps, json_loads, save_to_excel, get_last_holdings, GOLD_21K_RATIO
 from telegram_utils import send_telegram_message, format_price_alert
-from trading_strategy import get_trading_signal, find_support_resistance
+from trading_strategy import get_trading_signal, RollingIndicators
 
 # Configuration
-PRICE_HISTORY_FILE = "price_history.json"
+PRICE_HISTORY_FILE = "price_history.json"  # Snapshot, rewritten only on compaction
+PRICE_HISTORY_LOG = "price_history.jsonl"  # Append-only log of entries since the snapshot
 DAILY_NOTIFICATION_FILE = "daily_notification.json"  # Track daily summary sends
 MAX_HISTORY_ENTRIES = 200  # Keep more history for better analysis (need at least 30 for indicators)
+TRACKED_ASSETS = ("gold_24k", "usd", "gbp")
+# Fold the log into the snapshot once it holds a full window for every tracked asset
+# (600 lines: 200 entries x 3 assets); it was a flat 200 before that
+PRICE_LOG_COMPACT_ENTRIES = MAX_HISTORY_ENTRIES * len(TRACKED_ASSETS)
+DEDUPE_WINDOW_SECONDS = 60  # A repeat of the last price within this window isn't recorded again
 MIN_HISTORY_FOR_SIGNALS = 30  # Minimum history required before sending signals
 MIN_VOLATILITY_RATIO = 0.005  # Require at least 0.5% range over lookback to consider signal (avoid noise)
 DAILY_TIMEZONE = "Africa/Cairo"
@@ -22,6 +33,16 @@ DAILY_NOTIFICATION_HOUR = int(os.getenv("DAILY_NOTIFICATION_HOUR", "18"))
 DAILY_NOTIFICATION_MINUTE = int(os.getenv("DAILY_NOTIFICATION_MINUTE", "5"))
 # Snapshot from last price poll (for daily Telegram digest — no extra GoldAPI calls at digest time)
 _LAST_DIGEST_CACHE = {}
+# Merged price history (snapshot + log); "pending" holds entries not yet written to the log
+_HISTORY_CACHE = {"key": None, "data": None, "pending": [], "log_entries": 0}
+# Guards _HISTORY_CACHE: the web app reads history while the background checker appends
+_HISTORY_LOCK = threading.RLock()
+# asset -> (history deque, last entry pushed, RollingIndicators) for incremental indicator updates
+_INDICATOR_STATE = {}
+# asset -> (last entry, price, display name, candidate) from the last _get_signal_candidate
+_CANDIDATE_MEMO = {}
+# Parsed DAILY_NOTIFICATION_FILE, keyed on its (mtime_ns, size); read on every poll
+_DAILY_TRACKING_CACHE = {"key": None, "data": {}}
 
 UTC = ZoneInfo("UTC")
 
@@ -69,44 +90,164 @@ def _daily_summary_next_eligible(now_local):
     }
 
 
+def _file_key(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # Integer nanoseconds: float st_mtime can round two writes in the same tick together
+    return (st.st_mtime_ns, st.st_size)
+
+
 def load_price_history():
-    """Load price history from JSON file"""
-    if os.path.exists(PRICE_HISTORY_FILE):
-        try:
-            with open(PRICE_HISTORY_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
-    return {}
+    """
+    Load price history: the JSON snapshot plus any entries appended to the JSONL log since.
+    The merged dict is cached and only re-read when either file changes; entries added
+    through add_price_entry() are kept in memory until flush_price_history().
+    Each asset maps to a deque capped at MAX_HISTORY_ENTRIES (oldest entries drop off).
+    """
+    with _HISTORY_LOCK:
+        if _HISTORY_CACHE["pending"]:
+            return _HISTORY_CACHE["data"]
+        key = (_file_key(PRICE_HISTORY_FILE), _file_key(PRICE_HISTORY_LOG))
+        if _HISTORY_CACHE["data"] is not None and _HISTORY_CACHE["key"] == key:
+            return _HISTORY_CACHE["data"]
+
+        history = {}
+        if key[0] is not None:
+            try:
+                with open(PRICE_HISTORY_FILE, 'rb') as f:
+                    history = {
+                        asset: deque(entries, maxlen=MAX_HISTORY_ENTRIES)
+                        for asset, entries in json_loads(f.read()).items()
+                    }
+            except (json.JSONDecodeError, IOError):
+                history = {}
+
+        log_entries = 0
+        if key[1] is not None:
+            snapshot_last = {asset: entries[-1]["timestamp"] for asset, entries in history.items() if entries}
+            try:
+                with open(PRICE_HISTORY_LOG, 'rb') as f:
+                    for line in f:
+                        try:
+                            record = json_loads(line)
+                        except json.JSONDecodeError:
+                            continue  # partial last line from an interrupted write
+                        log_entries += 1
+                        entries = history.get(record["asset"])
+                        if entries is None:
+                            entries = history[record["asset"]] = deque(maxlen=MAX_HISTORY_ENTRIES)
+                        entry = {"timestamp": record["timestamp"], "price": record["price"]}
+                        # Skip entries already folded into the snapshot (crash during compaction)
+                        last = snapshot_last.get(record["asset"])
+                        if last is not None and entry["timestamp"] <= last and entry in entries:
+                            continue
+                        entries.append(entry)
+            except IOError:
+                pass
+
+        _HISTORY_CACHE["key"] = key
+        _HISTORY_CACHE["data"] = history
+        _HISTORY_CACHE["log_entries"] = log_entries
+        return history
+
+
+def price_history_as_lists(history):
+    """Copy of a loaded history with plain lists instead of deques (for JSON encoding)."""
+    with _HISTORY_LOCK:
+        return {asset: list(entries) for asset, entries in history.items()}
 
 
 def save_price_history(history):
-    """Save price history to JSON file"""
-    try:
-        with open(PRICE_HISTORY_FILE, 'w') as f:
-            json.dump(history, f, indent=2)
-    except IOError as e:
-        print(f"Error saving price history: {e}")
+    """Save the full price history as the JSON snapshot and clear the append log"""
+    with _HISTORY_LOCK:
+        try:
+            tmp_path = PRICE_HISTORY_FILE + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(json_dumps(price_history_as_lists(history)))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, PRICE_HISTORY_FILE)
+            try:
+                os.remove(PRICE_HISTORY_LOG)
+            except FileNotFoundError:
+                pass
+        except (IOError, OSError) as e:
+            print(f"Error saving price history: {e}")
+            return
+        _HISTORY_CACHE["key"] = (_file_key(PRICE_HISTORY_FILE), None)
+        _HISTORY_CACHE["data"] = history
+        _HISTORY_CACHE["pending"] = []
+        _HISTORY_CACHE["log_entries"] = 0
+
+
+def flush_price_history():
+    """
+    Append entries added since the last flush to the JSONL log (one line each, no
+    rewrite of older history). Once the log holds more than PRICE_LOG_COMPACT_ENTRIES
+    lines it is folded back into the JSON snapshot.
+    """
+    with _HISTORY_LOCK:
+        pending = _HISTORY_CACHE["pending"]
+        if not pending:
+            return
+        if _HISTORY_CACHE["log_entries"] + len(pending) > PRICE_LOG_COMPACT_ENTRIES:
+            save_price_history(_HISTORY_CACHE["data"])
+            return
+        try:
+            with open(PRICE_HISTORY_LOG, 'a+b') as f:
+                data = b"".join(json_dumps(record) + b"\n" for record in pending)
+                # Terminate a partial line left by an interrupted write so it can't swallow ours
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+        except IOError as e:
+            print(f"Error saving price history: {e}")
+            return
+        _HISTORY_CACHE["key"] = (_file_key(PRICE_HISTORY_FILE), _file_key(PRICE_HISTORY_LOG))
+        _HISTORY_CACHE["log_entries"] += len(pending)
+        _HISTORY_CACHE["pending"] = []
+
+
+# Entries added outside check_all_prices (or before a crash in it) still reach the log on exit
+atexit.register(flush_price_history)
 
 
 def load_daily_notification():
-    """Load daily notification tracking data."""
-    if os.path.exists(DAILY_NOTIFICATION_FILE):
+    """Load daily notification tracking data (cached until the file changes)."""
+    key = _file_key(DAILY_NOTIFICATION_FILE)
+    if _DAILY_TRACKING_CACHE["key"] == key:
+        return _DAILY_TRACKING_CACHE["data"]
+    tracking = {}
+    if key is not None:
         try:
-            with open(DAILY_NOTIFICATION_FILE, "r") as f:
-                return json.load(f)
+            with open(DAILY_NOTIFICATION_FILE, "rb") as f:
+                tracking = json_loads(f.read())
         except (json.JSONDecodeError, IOError):
-            return {}
-    return {}
+            tracking = {}
+    _DAILY_TRACKING_CACHE["key"] = key
+    _DAILY_TRACKING_CACHE["data"] = tracking
+    return tracking
 
 
 def save_daily_notification(tracking):
-    """Save daily notification tracking data."""
+    """Save daily notification tracking data (atomically, so a crash can't leave a torn file)."""
     try:
-        with open(DAILY_NOTIFICATION_FILE, "w") as f:
-            json.dump(tracking, f, indent=2)
-    except IOError as e:
+        tmp_path = DAILY_NOTIFICATION_FILE + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps(tracking))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, DAILY_NOTIFICATION_FILE)
+    except (IOError, OSError) as e:
         print(f"Error saving daily notification: {e}")
+        return
+    _DAILY_TRACKING_CACHE["key"] = _file_key(DAILY_NOTIFICATION_FILE)
+    _DAILY_TRACKING_CACHE["data"] = tracking
 
 
 def should_send_daily_notification(now_local):
@@ -249,7 +390,24 @@ def _format_daily_summary_message(now_local, gold_price_24k, usd_rate, gbp_rate,
     return "\n".join(lines)
 
 
-def _get_signal_candidate(asset_type, display_name, current_price):
+def _rolling_indicators(asset_type, entries):
+    """
+    RollingIndicators for an asset's history, advanced by the entry just appended.
+    Rebuilt from the full history when it was reloaded or changed some other way.
+    """
+    state = _INDICATOR_STATE.get(asset_type)
+    if state is not None and state[0] is entries and state[1] is entries[-1]:
+        return state[2]  # nothing appended (duplicate sample)
+    if state is not None and state[0] is entries and len(entries) >= 2 and state[1] is entries[-2]:
+        rolling = state[2]
+        rolling.push(entries[-1]["price"])
+    else:
+        rolling = RollingIndicators(entry["price"] for entry in entries)
+    _INDICATOR_STATE[asset_type] = (entries, entries[-1], rolling)
+    return rolling
+
+
+def _get_signal_candidate(asset_type, display_name, current_price, history=None, now=None):
     """
     Update history for an asset and (optionally) return a signal candidate.
 
@@ -267,16 +425,29 @@ def _get_signal_candidate(asset_type, display_name, current_price):
         return None
 
     # Add current price to history (include it in analysis)
-    add_price_entry(asset_type, current_price)
-
-    price_history = get_price_history_list(asset_type)
+    entries = add_price_entry(asset_type, current_price, history, now)
+    # Nothing appended for a repeat sample: the previous verdict for this price still holds
+    last_entry = entries[-1]
+    memo = _CANDIDATE_MEMO.get(asset_type)
+    if memo is not None and memo[0] is last_entry and memo[1] == current_price and memo[2] == display_name:
+        return memo[3]
+    candidate = _evaluate_candidate(asset_type, display_name, current_price, entries)
+    _CANDIDATE_MEMO[asset_type] = (last_entry, current_price, display_name, candidate)
+    return candidate
+
+
+def _evaluate_candidate(asset_type, display_name, current_price, entries):
+    """Signal candidate (or None) for an asset whose history already ends with current_price."""
+    # Always advance the rolling state; read indicators only once the cheap gates pass
+    rolling = _rolling_indicators(asset_type, entries)
 
     # Need sufficient history for reliable signals
-    if len(price_history) < MIN_HISTORY_FOR_SIGNALS:
+    if len(entries) < MIN_HISTORY_FOR_SIGNALS:
         return None
 
-    # Volatility filter: ignore if price range is too small (flat market)
-    support, resistance = find_support_resistance(price_history, lookback=20)
+    # Volatility filter: ignore if price range is too small (flat market).
+    # Only needs the 20-price range, so the SMAs/RSI are skipped for flat markets.
+    support, resistance = rolling.support_resistance(lookback=20)
     if support is not None and resistance is not None and resistance > support:
         mid_price = (support + resistance) / 2.0
         price_range = resistance - support
@@ -286,7 +457,9 @@ def _get_signal_candidate(asset_type, display_name, current_price):
                 # Market is too flat; treat as no meaningful signal
                 return None
 
-    signal, analysis = get_trading_signal(price_history, current_price, MIN_HISTORY_FOR_SIGNALS)
+    indicators = rolling.indicators()
+    # With indicators supplied only len(prices) is read, so the entries deque stands in for the list
+    signal, analysis = get_trading_signal(entries, current_price, MIN_HISTORY_FOR_SIGNALS, indicators)
     if not signal:
         return None
 
@@ -303,21 +476,33 @@ def _format_signal_short(candidate):
     Create a short/concise one-liner style message for a single asset signal.
     """
     action = candidate["signal"]
-    emoji = "🟢" if action == "BUY" else "🔴"
-    name = candidate["display_name"]
-    price = candidate["current_price"]
     analysis = candidate.get("analysis", {})
     indicators = analysis.get("indicators", {}) if isinstance(analysis, dict) else {}
     signal_count = analysis.get("buy_signals", 0) if action == "BUY" else analysis.get("sell_signals", 0)
 
     rsi = indicators.get("rsi")
     trend = indicators.get("trend")
+    # Rounded to display precision so repeated ticks hit the cache
+    return _format_signal_short_cached(
+        action,
+        candidate["display_name"],
+        round(candidate["current_price"], 2),
+        round(rsi, 1) if isinstance(rsi, (int, float)) else None,
+        str(trend) if trend else None,
+        signal_count,
+    )
+
+
+@lru_cache(maxsize=128)
+def _format_signal_short_cached(action, name, price, rsi, trend, signal_count):
+    """One-liner for _format_signal_short from its already-rounded display fields."""
+    emoji = "🟢" if action == "BUY" else "🔴"
 
     bits = []
-    if isinstance(rsi, (int, float)):
+    if rsi is not None:
         bits.append(f"RSI {rsi:.1f}")
     if trend:
-        bits.append(f"Trend {str(trend).title()}")
+        bits.append(f"Trend {trend.title()}")
     bits.append(f"Conf {signal_count}")
 
     details = " | ".join(bits)
@@ -333,52 +518,79 @@ def _format_fx_combined_short(candidates):
     return "\n".join(lines)
 
 
-def add_price_entry(asset_type, price):
+def _entry_timestamp(moment):
     """
-    Add a new price entry to history
-    
-    Args:
-        asset_type (str): Type of asset (e.g., "gold_24k", "usd", "gbp")
-        price (float): Current price
+    History timestamp ("%Y-%m-%d %H:%M:%S") for a naive datetime. isoformat() yields the
+    same text as that strftime pattern without parsing a format string on every entry.
     """
-    history = load_price_history()
-    
-    if asset_type not in history:
-        history[asset_type] = []
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return moment.isoformat(" ", "seconds")
+
+
+def _append_entry(history, asset_type, price, now=None):
+    """Append a price stamped with now (default: current time) to an in-memory history dict; returns the entry."""
+    entries = history.get(asset_type)
+    if entries is None:
+        entries = history[asset_type] = deque(maxlen=MAX_HISTORY_ENTRIES)
     entry = {
-        "timestamp": timestamp,
+        "timestamp": _entry_timestamp(now or datetime.now()),
         "price": price
     }
-    
-    history[asset_type].append(entry)
-    
-    # Keep only the last MAX_HISTORY_ENTRIES entries
-    if len(history[asset_type]) > MAX_HISTORY_ENTRIES:
-        history[asset_type] = history[asset_type][-MAX_HISTORY_ENTRIES:]
-    
-    save_price_history(history)
-    return history[asset_type]
+    # The deque's maxlen drops the oldest entry once MAX_HISTORY_ENTRIES is reached
+    entries.append(entry)
+    return entry
+
+
+def _prices(history, asset_type):
+    """List of prices for an asset type from an in-memory history dict."""
+    return [entry["price"] for entry in history.get(asset_type, ())]
 
 
-def get_price_history_list(asset_type):
+def _is_duplicate_sample(last_entry, price, now=None):
+    """True if price repeats last_entry and was sampled within DEDUPE_WINDOW_SECONDS of it."""
+    if not math.isclose(last_entry["price"], price, rel_tol=1e-6):
+        return False
+    # Timestamps are zero-padded "%Y-%m-%d %H:%M:%S" strings, so they compare chronologically
+    window_start = (now or datetime.now()) - timedelta(seconds=DEDUPE_WINDOW_SECONDS)
+    return last_entry["timestamp"] > _entry_timestamp(window_start)
+
+
+def add_price_entry(asset_type, price, history=None, now=None):
+    """
+    Add a new price entry to history.
+    The entry is kept in memory; call flush_price_history() to append it to the log.
+    A repeat of the last recorded price within DEDUPE_WINDOW_SECONDS is not added again.
+    
+    Args:
+        asset_type (str): Type of asset (e.g., "gold_24k", "usd", "gbp")
+        price (float): Current price
+        history (dict): Already-loaded history from load_price_history() (optional)
+        now (datetime): Naive local time to stamp the entry with (default: current time)
+    """
+    with _HISTORY_LOCK:
+        if history is None:
+            history = load_price_history()
+        entries = history.get(asset_type)
+        if entries and _is_duplicate_sample(entries[-1], price, now):
+            return entries
+        entry = _append_entry(history, asset_type, price, now)
+        _HISTORY_CACHE["pending"].append({"asset": asset_type, **entry})
+        return history[asset_type]
+
+
+def get_price_history_list(asset_type, history=None):
     """Get list of prices for an asset type (for analysis)"""
-    history = load_price_history()
-    if asset_type in history and len(history[asset_type]) > 0:
-        return [entry["price"] for entry in history[asset_type]]
-    return []
+    if history is None:
+        history = load_price_history()
+    return _prices(history, asset_type)
 
 
 def get_latest_price(asset_type):
     """Get the latest price for an asset type"""
-    history = load_price_history()
-    if asset_type in history and len(history[asset_type]) > 0:
-        return history[asset_type][-1]["price"]
-    return None
+    entries = load_price_history().get(asset_type)
+    return entries[-1]["price"] if entries else None
 
 
-def check_and_notify(asset_type, display_name, current_price):
+def check_and_notify(asset_type, display_name, current_price, history=None):
     """
     Check if trading indicators trigger a buy/sell signal and send notification
     Uses real-world trading strategies: Moving Averages, RSI, Support/Resistance
@@ -387,8 +599,12 @@ def check_and_notify(asset_type, display_name, current_price):
         asset_type (str): Internal asset type (e.g., "gold_24k")
         display_name (str): Display name for notifications (e.g., "Gold 24k")
         current_price (float): Current price
+        history (dict): Shared history from load_price_history(); when given, the
+            caller is responsible for flush_price_history()
     """
-    candidate = _get_signal_candidate(asset_type, display_name, current_price)
+    candidate = _get_signal_candidate(asset_type, display_name, current_price, history)
+    if history is None:
+        flush_price_history()
     if not candidate:
         return
 
@@ -397,6 +613,76 @@ def check_and_notify(asset_type, display_name, current_price):
     send_telegram_message(message)
 
 
+# Static blocks of format_trading_alert (built once, not per alert)
+_BUY_EXPLANATION = (
+    "📋 <b>WHAT THIS MEANS:</b>",
+    "Multiple indicators suggest this is a good time to BUY.",
+    "The price may be at a low point and could rise soon.",
+    "",
+    "✅ <b>RECOMMENDED ACTION:</b>",
+    "• Consider buying now if you were planning to invest",
+    "• This could be a good entry point",
+    "• However, always do your own research before investing",
+    "",
+)
+_SELL_EXPLANATION = (
+    "📋 <b>WHAT THIS MEANS:</b>",
+    "Multiple indicators suggest this is a good time to SELL.",
+    "The price may be at a high point and could drop soon.",
+    "",
+    "✅ <b>RECOMMENDED ACTION:</b>",
+    "• Consider selling if you want to take profits",
+    "• This could be a good exit point",
+    "• However, always do your own research before selling",
+    "",
+)
+# Threshold ladders for format_trading_alert. Values below a "low" break (strict <) or
+# above a "high" break (strict >) move one bucket out from the middle; see _bucket().
+_RSI_LOW_BREAKS = (30, 40)
+_RSI_HIGH_BREAKS = (60, 70)
+_RSI_NOTES = (
+    "   → <i>RSI is VERY LOW (Oversold) = Asset may be undervalued, good BUY opportunity</i>",
+    "   → <i>RSI is LOW (Approaching oversold) = Could be a good time to buy</i>",
+    "   → <i>RSI is NEUTRAL (40-60) = No strong signal</i>",
+    "   → <i>RSI is HIGH (Approaching overbought) = Could be a good time to sell</i>",
+    "   → <i>RSI is VERY HIGH (Overbought) = Asset may be overvalued, good SELL opportunity</i>",
+)
+_POSITION_LOW_BREAKS = (30,)
+_POSITION_HIGH_BREAKS = (70,)
+_POSITION_NOTES = (
+    "   → <i>Price is NEAR SUPPORT (bottom) = Good time to BUY</i>",
+    "   → <i>Price is in the MIDDLE = Neutral</i>",
+    "   → <i>Price is NEAR RESISTANCE (top) = Good time to SELL</i>",
+)
+_CONFIDENCE_BREAKS = (3, 4)  # signal_count >= break moves up a level
+_CONFIDENCE_LEVELS = (
+    ("⭐ <b>MODERATE</b>", "   → Some indicators agree"),
+    ("⭐⭐ <b>STRONG</b>", "   → Several indicators agree"),
+    ("⭐⭐⭐ <b>VERY STRONG</b>", "   → Multiple indicators strongly agree"),
+)
+
+
+def _bucket(value, low_breaks, high_breaks):
+    """
+    Index of value on a ladder: 0..len(low_breaks) for value < each low break,
+    then up to len(low_breaks) + len(high_breaks) for value > each high break.
+    """
+    index = bisect_right(low_breaks, value)
+    if index == len(low_breaks):
+        index += bisect_left(high_breaks, value)
+    return index
+
+
+_ALERT_DISCLAIMER = (
+    "",
+    "⚠️ <b>IMPORTANT REMINDER:</b>",
+    "This is an automated signal based on technical analysis.",
+    "Always do your own research and consider your financial situation",
+    "before making any investment decisions.",
+    "Past performance does not guarantee future results.",
+)
+
+
 def format_trading_alert(asset_type, action, current_price, analysis):
     """
     Format a trading alert message with detailed analysis and beginner-friendly explanations
@@ -413,61 +699,44 @@ def format_trading_alert(asset_type, action, current_price, analysis):
     emoji = "🟢" if action == "BUY" else "🔴"
     signal_count = analysis.get('buy_signals', 0) if action == 'BUY' else analysis.get('sell_signals', 0)
     
-    message = f"{emoji} <b>{action} SIGNAL: {asset_type}</b>\n"
-    message += "=" * 40 + "\n\n"
-    
-    # Current Price
-    message += f"💰 <b>Current Price:</b> {current_price:.2f}\n\n"
+    lines = [
+        f"{emoji} <b>{action} SIGNAL: {asset_type}</b>",
+        "=" * 40,
+        "",
+        # Current Price
+        f"💰 <b>Current Price:</b> {current_price:.2f}",
+        "",
+    ]
     
     # What to do section
-    if action == "BUY":
-        message += "📋 <b>WHAT THIS MEANS:</b>\n"
-        message += "Multiple indicators suggest this is a good time to BUY.\n"
-        message += "The price may be at a low point and could rise soon.\n\n"
-        message += "✅ <b>RECOMMENDED ACTION:</b>\n"
-        message += "• Consider buying now if you were planning to invest\n"
-        message += "• This could be a good entry point\n"
-        message += "• However, always do your own research before investing\n\n"
-    else:  # SELL
-        message += "📋 <b>WHAT THIS MEANS:</b>\n"
-        message += "Multiple indicators suggest this is a good time to SELL.\n"
-        message += "The price may be at a high point and could drop soon.\n\n"
-        message += "✅ <b>RECOMMENDED ACTION:</b>\n"
-        message += "• Consider selling if you want to take profits\n"
-        message += "• This could be a good exit point\n"
-        message += "• However, always do your own research before selling\n\n"
+    lines += _BUY_EXPLANATION if action == "BUY" else _SELL_EXPLANATION
     
     indicators = analysis.get("indicators", {})
     reasons = analysis.get("reasons", [])
     
-    message += "📊 <b>TECHNICAL ANALYSIS:</b>\n\n"
+    lines += ["📊 <b>TECHNICAL ANALYSIS:</b>", ""]
     
     # Moving Averages explanation
     if indicators.get("sma_10") and indicators.get("sma_30"):
         sma_10 = indicators['sma_10']
         sma_30 = indicators['sma_30']
-        message += f"📈 <b>Moving Averages (Trend Indicator):</b>\n"
-        message += f"   • Short-term average (10 periods): {sma_10:.2f}\n"
-        message += f"   • Long-term average (30 periods): {sma_30:.2f}\n"
+        lines += [
+            "📈 <b>Moving Averages (Trend Indicator):</b>",
+            f"   • Short-term average (10 periods): {sma_10:.2f}",
+            f"   • Long-term average (30 periods): {sma_30:.2f}",
+        ]
         if sma_10 > sma_30:
-            message += f"   → <i>Short-term is ABOVE long-term = Upward trend (Good for buying)</i>\n\n"
+            lines.append("   → <i>Short-term is ABOVE long-term = Upward trend (Good for buying)</i>")
         else:
-            message += f"   → <i>Short-term is BELOW long-term = Downward trend (Good for selling)</i>\n\n"
+            lines.append("   → <i>Short-term is BELOW long-term = Downward trend (Good for selling)</i>")
+        lines.append("")
     
     # RSI explanation
     if indicators.get("rsi"):
         rsi = indicators["rsi"]
-        message += f"📉 <b>RSI - Relative Strength Index:</b> {rsi:.1f}/100\n"
-        if rsi < 30:
-            message += f"   → <i>RSI is VERY LOW (Oversold) = Asset may be undervalued, good BUY opportunity</i>\n\n"
-        elif rsi > 70:
-            message += f"   → <i>RSI is VERY HIGH (Overbought) = Asset may be overvalued, good SELL opportunity</i>\n\n"
-        elif rsi < 40:
-            message += f"   → <i>RSI is LOW (Approaching oversold) = Could be a good time to buy</i>\n\n"
-        elif rsi > 60:
-            message += f"   → <i>RSI is HIGH (Approaching overbought) = Could be a good time to sell</i>\n\n"
-        else:
-            message += f"   → <i>RSI is NEUTRAL (40-60) = No strong signal</i>\n\n"
+        lines.append(f"📉 <b>RSI - Relative Strength Index:</b> {rsi:.1f}/100")
+        lines.append(_RSI_NOTES[_bucket(rsi, _RSI_LOW_BREAKS, _RSI_HIGH_BREAKS)])
+        lines.append("")
     
     # Support/Resistance explanation
     if indicators.get("support") and indicators.get("resistance"):
@@ -476,55 +745,41 @@ def format_trading_alert(asset_type, action, current_price, analysis):
         price_range = resistance - support
         price_position = ((current_price - support) / price_range * 100) if price_range > 0 else 50
         
-        message += f"🎯 <b>Price Levels:</b>\n"
-        message += f"   • Support (Low point): {support:.2f}\n"
-        message += f"   • Resistance (High point): {resistance:.2f}\n"
-        message += f"   • Current position: {price_position:.1f}% of the range\n"
+        lines += [
+            "🎯 <b>Price Levels:</b>",
+            f"   • Support (Low point): {support:.2f}",
+            f"   • Resistance (High point): {resistance:.2f}",
+            f"   • Current position: {price_position:.1f}% of the range",
+        ]
         
-        if price_position < 30:
-            message += f"   → <i>Price is NEAR SUPPORT (bottom) = Good time to BUY</i>\n\n"
-        elif price_position > 70:
-            message += f"   → <i>Price is NEAR RESISTANCE (top) = Good time to SELL</i>\n\n"
-        else:
-            message += f"   → <i>Price is in the MIDDLE = Neutral</i>\n\n"
+        lines.append(_POSITION_NOTES[_bucket(price_position, _POSITION_LOW_BREAKS, _POSITION_HIGH_BREAKS)])
+        lines.append("")
     
     # Trend explanation
     if indicators.get("trend"):
         trend = indicators["trend"]
         trend_emoji = "📈" if trend == "bullish" else "📉"
-        message += f"{trend_emoji} <b>Overall Trend:</b> {trend.title()}\n"
+        lines.append(f"{trend_emoji} <b>Overall Trend:</b> {trend.title()}")
         if trend == "bullish":
-            message += f"   → <i>Prices are generally going UP = Positive momentum</i>\n\n"
+            lines.append("   → <i>Prices are generally going UP = Positive momentum</i>")
         else:
-            message += f"   → <i>Prices are generally going DOWN = Negative momentum</i>\n\n"
+            lines.append("   → <i>Prices are generally going DOWN = Negative momentum</i>")
+        lines.append("")
     
     # Signal strength
-    message += "🔍 <b>WHY THIS SIGNAL:</b>\n"
-    if reasons:
-        for i, reason in enumerate(reasons, 1):
-            message += f"   {i}. {reason}\n"
-    message += "\n"
+    lines.append("🔍 <b>WHY THIS SIGNAL:</b>")
+    lines.extend(f"   {i}. {reason}" for i, reason in enumerate(reasons, 1))
+    lines.append("")
     
     # Confidence level
-    message += "💪 <b>CONFIDENCE LEVEL:</b>\n"
-    if signal_count >= 4:
-        message += f"   ⭐⭐⭐ <b>VERY STRONG</b> ({signal_count} confirmations)\n"
-        message += "   → Multiple indicators strongly agree\n"
-    elif signal_count >= 3:
-        message += f"   ⭐⭐ <b>STRONG</b> ({signal_count} confirmations)\n"
-        message += "   → Several indicators agree\n"
-    else:
-        message += f"   ⭐ <b>MODERATE</b> ({signal_count} confirmations)\n"
-        message += "   → Some indicators agree\n"
+    lines.append("💪 <b>CONFIDENCE LEVEL:</b>")
+    label, note = _CONFIDENCE_LEVELS[bisect_right(_CONFIDENCE_BREAKS, signal_count)]
+    lines.append(f"   {label} ({signal_count} confirmations)")
+    lines.append(note)
     
-    message += "\n"
-    message += "⚠️ <b>IMPORTANT REMINDER:</b>\n"
-    message += "This is an automated signal based on technical analysis.\n"
-    message += "Always do your own research and consider your financial situation\n"
-    message += "before making any investment decisions.\n"
-    message += "Past performance does not guarantee future results."
+    lines += _ALERT_DISCLAIMER
     
-    return message
+    return "\n".join(lines)
 
 
 def _save_daily_wealth_snapshot(now_local, gold_price_24k, gold_price_21k, usd_rate):
@@ -549,7 +804,7 @@ def _save_daily_wealth_snapshot(now_local, gold_price_24k, gold_price_21k, usd_r
     
     # Calculate values
     gold_value_24k = round(gold_24k * gold_price_24k, 2) if gold_24k else 0
-    gold_value_21k = round(gold_21k * (gold_price_21k or gold_price_24k * 21/24), 2) if gold_21k else 0
+    gold_value_21k = round(gold_21k * (gold_price_21k or gold_price_24k * GOLD_21K_RATIO), 2) if gold_21k else 0
     total_gold_value = round(gold_value_24k + gold_value_21k, 2)
     total_usd_value = round(usd_balance * usd_rate, 2) if usd_balance else 0
     total_wealth = round(total_gold_value + total_usd_value, 2)
@@ -577,13 +832,18 @@ def _save_daily_wealth_snapshot(now_local, gold_price_24k, gold_price_21k, usd_r
     }
 
 
-def check_all_prices():
+def check_all_prices(now=None):
     """
     Check all tracked prices and send notifications if needed.
     Also saves daily wealth snapshot using last entered holdings.
     This is the main function to call periodically.
+
+    The clock is read once (or taken from ``now``, an aware datetime) and shared by
+    everything stamped during this check.
     """
-    now_local = datetime.now(ZoneInfo(DAILY_TIMEZONE))
+    now_local = (now or datetime.now(UTC)).astimezone(ZoneInfo(DAILY_TIMEZONE))
+    # History entries are stamped in server-local time
+    entry_time = now_local.astimezone().replace(tzinfo=None)
     daily_status = _daily_summary_next_eligible(now_local)
     print(
         "[DailySummary] "
@@ -595,25 +855,33 @@ def check_all_prices():
         f"time_left={str(daily_status['remaining'])}"
     )
 
-    # Gold: only track 24k (same signal direction as 21k for our purposes)
-    gold_price_24k, gold_price_21k = get_gold_price()
-    gold_candidate = None
-    if gold_price_24k:
-        gold_candidate = _get_signal_candidate("gold_24k", "Gold 24k (EGP/gm)", gold_price_24k)
+    # Fresh gold and FX prices, fetched together in one batch
+    rates = fetch_all_rates(ttl=0)
+    gold_price_24k, gold_price_21k = rates["gold_24k"], rates["gold_21k"]
+    usd_rate = rates["usd"]
+    gbp_rate = rates["gbp"]
+    history = load_price_history()
 
-    # Currencies: compute candidates, but send ONE combined message (max)
+    gold_candidate = None
     fx_candidates = []
-    usd_rate = get_official_usd_rate()
-    if usd_rate:
-        c = _get_signal_candidate("usd", "USD/EGP", usd_rate)
-        if c:
-            fx_candidates.append(c)
-
-    gbp_rate = get_gbp_rate()
-    if gbp_rate:
-        c = _get_signal_candidate("gbp", "GBP/EGP", gbp_rate)
-        if c:
-            fx_candidates.append(c)
+    try:
+        # Gold: only track 24k (same signal direction as 21k for our purposes)
+        if gold_price_24k:
+            gold_candidate = _get_signal_candidate("gold_24k", "Gold 24k (EGP/gm)", gold_price_24k, history, entry_time)
+
+        # Currencies: compute candidates, but send ONE combined message (max)
+        if usd_rate:
+            c = _get_signal_candidate("usd", "USD/EGP", usd_rate, history, entry_time)
+            if c:
+                fx_candidates.append(c)
+
+        if gbp_rate:
+            c = _get_signal_candidate("gbp", "GBP/EGP", gbp_rate, history, entry_time)
+            if c:
+                fx_candidates.append(c)
+    finally:
+        # One write for all entries added this cycle, even if an analysis step failed
+        flush_price_history()
 
     _update_digest_cache(
         now_local,
@@ -5,6 +5,7 @@ Handles bot commands like /paypal <amount>
 import os
 import json
 import hmac
+from concurrent.futures import ThreadPoolExecutor
 from flask import request, jsonify
 from dotenv import load_dotenv
 from telegram_utils import send_telegram_message, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
@@ -14,6 +15,10 @@ load_dotenv()
 
 # Webhook secret token from environment
 TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "").strip()
+_WEBHOOK_SECRET_BYTES = TELEGRAM_WEBHOOK_SECRET.encode("utf-8")
+
+# Commands run on one worker so their replies (e.g. "Calculating..." then the result) stay in order
+_COMMAND_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telegram-cmd")
 
 
 def verify_telegram_webhook(secret_token_header):
@@ -31,15 +36,93 @@ def verify_telegram_webhook(secret_token_header):
         # No token provided when secret is configured
         return False
 
-    # Compare tokens (constant time to prevent timing attacks)
-    return hmac.compare_digest(TELEGRAM_WEBHOOK_SECRET, secret_token_header)
+    # Compare tokens (constant time to prevent timing attacks). As bytes, so a
+    # non-ASCII header is a mismatch rather than a TypeError from compare_digest.
+    return hmac.compare_digest(_WEBHOOK_SECRET_BYTES, secret_token_header.encode("utf-8"))
+
+
+def _handle_paypal(chat_id, args):
+    """/paypal <amount>: decide between a manual transfer now and the monthly auto-transfer."""
+    if not args:
+        send_telegram_message(
+            "❌ <b>Usage:</b> /paypal &lt;amount&gt;\n\n"
+            "Example: /paypal 1000\n"
+            "This will check if manual transfer (150 EGP tax) is worth it vs waiting for auto-transfer.",
+            chat_id=chat_id
+        )
+        return
+
+    try:
+        amount = float(args[0])
+        if amount <= 0:
+            send_telegram_message("❌ Amount must be greater than 0", chat_id=chat_id)
+            return
+
+        # Send "calculating" message
+        send_telegram_message("⏳ Calculating transfer decision...", chat_id=chat_id)
+
+        # Calculate and send result
+        decision = calculate_paypal_transfer(amount)
+        if decision:
+            message_text = format_paypal_transfer_message(decision)
+            send_telegram_message(message_text, chat_id=chat_id)
+        else:
+            send_telegram_message("❌ Error: Could not calculate transfer decision. Check GBP rate availability.", chat_id=chat_id)
+
+    except ValueError:
+        send_telegram_message(f"❌ Invalid amount: '{args[0]}'. Please provide a number.\n\nExample: /paypal 1000", chat_id=chat_id)
+    except Exception as e:
+        send_telegram_message(f"❌ Error: {str(e)}", chat_id=chat_id)
+
+
+_HELP_MESSAGE = (
+    "🤖 <b>Finansly Bot Commands</b>\n\n"
+    "📊 <b>/paypal &lt;amount&gt;</b>\n"
+    "Check if manual PayPal transfer is worth it\n"
+    "Example: /paypal 1000\n\n"
+    "This calculates whether to:\n"
+    "• Transfer manually now (150 EGP tax)\n"
+    "• OR wait for auto-transfer on 1st (no tax)\n\n"
+    "The bot will compare current rate vs estimated future rate and tell you which option saves more money."
+)
+
+
+def _handle_help(chat_id, args):
+    """/help and /start: list the bot's commands."""
+    send_telegram_message(_HELP_MESSAGE, chat_id=chat_id)
+
+
+# Command name (without any @botname suffix) -> handler(chat_id, args)
+_HANDLERS = {
+    "/paypal": _handle_paypal,
+    "/help": _handle_help,
+    "/start": _handle_help,
+}
+
+
+def _process_command(chat_id, text):
+    """
+    Run a bot command and send its replies. Called on _COMMAND_POOL, off the
+    webhook request thread.
+    """
+    parts = text.split()
+    if not parts:
+        return
+    # "/paypal@FinanslyBot 1000" is addressed to this bot in groups
+    handler = _HANDLERS.get(parts[0].split("@", 1)[0])
+    if handler is None:
+        return
+    try:
+        handler(chat_id, parts[1:])
+    except Exception as e:
+        print(f"Error processing Telegram command: {e}")
 
 
 def handle_telegram_webhook():
     """
     Handle incoming Telegram webhook messages.
     Verifies request signature before processing.
-    Processes bot commands and sends responses.
+    Commands are queued to _process_command, which sends the responses.
     """
     try:
         secret_token = request.headers.get("X-Telegram-Bot-API-Secret-Token", "")
@@ -51,10 +134,10 @@ def handle_telegram_webhook():
         data = request.get_json()
         
         # Telegram sends updates in this format
-        if "message" not in data:
+        message = data.get("message")
+        if message is None:
             return jsonify({"ok": True})
         
-        message = data["message"]
         chat_id = message.get("chat", {}).get("id")
         text = message.get("text", "").strip()
         
@@ -62,55 +145,8 @@ def handle_telegram_webhook():
         if str(chat_id) != str(TELEGRAM_CHAT_ID):
             return jsonify({"ok": True})
         
-        # Handle /paypal command
-        if text.startswith("/paypal") or text.startswith("/paypal@"):
-            # Extract amount from command
-            parts = text.split()
-            if len(parts) < 2:
-                send_telegram_message(
-                    "❌ <b>Usage:</b> /paypal &lt;amount&gt;\n\n"
-                    "Example: /paypal 1000\n"
-                    "This will check if manual transfer (150 EGP tax) is worth it vs waiting for auto-transfer.",
-                    chat_id=chat_id
-                )
-                return jsonify({"ok": True})
-            
-            try:
-                amount = float(parts[1])
-                if amount <= 0:
-                    send_telegram_message("❌ Amount must be greater than 0", chat_id=chat_id)
-                    return jsonify({"ok": True})
-                
-                # Send "calculating" message
-                send_telegram_message("⏳ Calculating transfer decision...", chat_id=chat_id)
-                
-                # Calculate and send result
-                decision = calculate_paypal_transfer(amount)
-                if decision:
-                    message_text = format_paypal_transfer_message(decision)
-                    send_telegram_message(message_text, chat_id=chat_id)
-                else:
-                    send_telegram_message("❌ Error: Could not calculate transfer decision. Check GBP rate availability.", chat_id=chat_id)
-                    
-            except ValueError:
-                send_telegram_message(f"❌ Invalid amount: '{parts[1]}'. Please provide a number.\n\nExample: /paypal 1000", chat_id=chat_id)
-            except Exception as e:
-                send_telegram_message(f"❌ Error: {str(e)}", chat_id=chat_id)
-        
-        # Handle /help command
-        elif text.startswith("/help") or text.startswith("/start"):
-            help_message = (
-                "🤖 <b>Finansly Bot Commands</b>\n\n"
-                "📊 <b>/paypal &lt;amount&gt;</b>\n"
-                "Check if manual PayPal transfer is worth it\n"
-                "Example: /paypal 1000\n\n"
-                "This calculates whether to:\n"
-                "• Transfer manually now (150 EGP tax)\n"
-                "• OR wait for auto-transfer on 1st (no tax)\n\n"
-                "The bot will compare current rate vs estimated future rate and tell you which option saves more money."
-            )
-            send_telegram_message(help_message, chat_id=chat_id)
-        
+        # Reply from the worker thread so Telegram gets its 200 without waiting on our sends
+        _COMMAND_POOL.submit(_process_command, chat_id, text)
         return jsonify({"ok": True})
         
     except Exception as e:
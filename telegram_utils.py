@@ -4,6 +4,7 @@ Telegram notification utilities for price alerts
 import os
 from dotenv import load_dotenv
 import requests
+from http_session import HTTP_SESSION
 
 # Load environment variables
 load_dotenv()
@@ -11,6 +12,9 @@ load_dotenv()
 # Telegram Bot Configuration
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# Built once; only chat_id and text change between messages
+_TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+_BASE_PAYLOAD = {"parse_mode": "HTML"}
 
 
 def send_telegram_message(message, chat_id=None):
@@ -34,14 +38,10 @@ def send_telegram_message(message, chat_id=None):
         return False
     
     try:
-        telegram_api_url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {
-            "chat_id": target_chat_id,
-            "text": message,
-            "parse_mode": "HTML"
-        }
+        payload = {**_BASE_PAYLOAD, "chat_id": target_chat_id, "text": message}
         
-        response = requests.post(telegram_api_url, json=payload, timeout=10)
+        # Shared pooled session; a POST is only retried if the connection failed, so never sent twice
+        response = HTTP_SESSION.post(_TELEGRAM_API_URL, json=payload, timeout=10)
         response.raise_for_status()
         return True
     except requests.exceptions.HTTPError as e:
@@ -74,12 +74,12 @@ def format_price_alert(asset_type, action, current_price, previous_price=None, c
     """
     emoji = "🟢" if action == "BUY" else "🔴"
     
-    message = f"{emoji} <b>{action} Signal: {asset_type}</b>\n\n"
-    message += f"Current Price: {current_price}\n"
+    lines = [f"{emoji} <b>{action} Signal: {asset_type}</b>", "", f"Current Price: {current_price}"]
     
     if previous_price and change_percent:
         direction = "📉" if change_percent < 0 else "📈"
-        message += f"{direction} Previous: {previous_price}\n"
-        message += f"Change: {change_percent:+.2f}%\n"
+        lines.append(f"{direction} Previous: {previous_price}")
+        lines.append(f"Change: {change_percent:+.2f}%")
     
-    return message
+    lines.append("")
+    return "\n".join(lines)
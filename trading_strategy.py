@@ -2,7 +2,9 @@
 Real-world trading strategy indicators for buy/sell signals
 Uses Moving Averages, RSI, and Support/Resistance levels
 """
-from typing import List, Optional, Tuple
+from collections import deque
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
 
 
 def calculate_sma(prices: List[float], period: int) -> Optional[float]:
@@ -94,11 +96,11 @@ def calculate_rsi(prices: List[float], period: int = 14) -> Optional[float]:
         if (max_abs_change / abs(last_price)) < 0.0005:
             return 50.0
     
-    if avg_loss == 0:
-        return 100  # All gains, no losses (strong up-move)
-    
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+    # 100 - 100 / (1 + RS) rewritten as one divide; all gains, no losses gives 100
+    total = avg_gain + avg_loss
+    if total == 0:
+        return 50.0  # no movement at all (only reachable when the last price is 0)
+    rsi = 100 * avg_gain / total
     
     return round(rsi, 2)
 
@@ -149,10 +151,88 @@ def analyze_trend(prices: List[float], short_period: int = 10, long_period: int
     return None
 
 
+# Prices the indicators below read at most: SMA 30, or the 15 prices / 14 changes of RSI 14
+INDICATOR_WINDOW = 31
+
+
+def calculate_indicators(prices: List[float]) -> dict:
+    """
+    SMA 10/30, RSI 14, 20-period support/resistance and the SMA trend of a price series,
+    in the shape get_trading_signal reports under analysis["indicators"].
+
+    The functions above are run once over a shared copy of the last INDICATOR_WINDOW
+    prices, and the trend is read off the two SMAs instead of recomputing them.
+    """
+    tail = prices[-INDICATOR_WINDOW:]
+    sma_10 = calculate_sma(tail, 10)
+    sma_30 = calculate_sma(tail, 30)
+    support, resistance = find_support_resistance(tail, 20)
+    trend = None
+    if sma_10 is not None and sma_30 is not None:
+        if sma_10 > sma_30:
+            trend = "bullish"
+        elif sma_10 < sma_30:
+            trend = "bearish"
+    return {
+        "sma_10": sma_10,
+        "sma_30": sma_30,
+        "rsi": calculate_rsi(tail, 14),
+        "support": support,
+        "resistance": resistance,
+        "trend": trend
+    }
+
+
+class RollingIndicators:
+    """
+    Indicators used by get_trading_signal, kept for a price series one price at a time.
+
+    Only the last INDICATOR_WINDOW prices are kept, so push() is O(1) and reads cost the
+    same however long the history grows. Values come from calculate_indicators() over that
+    tail, so they are bit-for-bit identical to calculating them from the whole price list.
+    The indicator dict is memoized until the next push(), so re-reading it for an
+    unchanged series (e.g. a duplicate sample) costs nothing.
+    """
+    __slots__ = ("count", "_window", "_indicators")
+
+    WINDOW = INDICATOR_WINDOW
+
+    def __init__(self, prices: Iterable[float] = ()):
+        self.count = 0
+        self._window = deque(maxlen=self.WINDOW)
+        self._indicators = None
+        for price in prices:
+            self.push(price)
+
+    def push(self, price: float) -> None:
+        """Add the next (most recent) price."""
+        self._window.append(price)
+        self.count += 1
+        self._indicators = None
+
+    def support_resistance(self, lookback: int = 20) -> Tuple[Optional[float], Optional[float]]:
+        """(support, resistance) over the last lookback prices (at most 31), like find_support_resistance."""
+        if self.count < lookback:
+            return (None, None)
+        window = self._window
+        recent_prices = list(islice(window, len(window) - lookback, None))
+        return (min(recent_prices), max(recent_prices))
+
+    def indicators(self) -> dict:
+        """
+        Indicator dict in the shape get_trading_signal reports under analysis["indicators"].
+        The same dict is returned until the next push(); treat it as read-only.
+        """
+        if self._indicators is None:
+            self._indicators = calculate_indicators(list(self._window))
+        return self._indicators
+
+
 def get_trading_signal(
     prices: List[float],
     current_price: float,
-    min_history: int = 30
+    min_history: int = 30,
+    indicators: Optional[dict] = None
 ) -> Tuple[Optional[str], dict]:
     """
     Generate buy/sell signal using multiple indicators
@@ -164,9 +244,12 @@ def get_trading_signal(
     - Requires multiple confirmations for reliability
     
     Args:
-        prices: Historical prices (most recent last)
+        prices: Historical prices (most recent last); only its length is used when
+            indicators are given
         current_price: Current price
         min_history: Minimum history required for analysis
+        indicators: Precomputed indicators for prices (e.g. RollingIndicators.indicators());
+            computed from prices when omitted
         
     Returns:
         Tuple of (signal: "BUY"/"SELL"/None, analysis_dict)
@@ -179,21 +262,16 @@ def get_trading_signal(
         "indicators": {}
     }
     
-    # Calculate indicators
-    sma_10 = calculate_sma(prices, 10)
-    sma_30 = calculate_sma(prices, 30)
-    rsi = calculate_rsi(prices, 14)
-    support, resistance = find_support_resistance(prices, 20)
-    trend = analyze_trend(prices, 10, 30)
+    if indicators is None:
+        indicators = calculate_indicators(prices)
+    sma_10 = indicators["sma_10"]
+    sma_30 = indicators["sma_30"]
+    rsi = indicators["rsi"]
+    support = indicators["support"]
+    resistance = indicators["resistance"]
+    trend = indicators["trend"]
     
-    analysis["indicators"] = {
-        "sma_10": sma_10,
-        "sma_30": sma_30,
-        "rsi": rsi,
-        "support": support,
-        "resistance": resistance,
-        "trend": trend
-    }
+    analysis["indicators"] = indicators
     
     # Count confirmations
     buy_signals = 0